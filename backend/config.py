@@ -29,7 +29,53 @@ class Config:
     
     # Session Configuration
     SESSION_EXPIRE_MINUTES = int(os.getenv("SESSION_EXPIRE_MINUTES", 60))
-    REDIS_URL = os.getenv("REDIS_URL", "")
+    REDIS_URL = os.getenv("REDIS_URL", "")  # Shared session store; required for multiple workers
+    SESSION_HISTORY_LIMIT = int(os.getenv("SESSION_HISTORY_LIMIT", 200))  # Ring buffer size per session
+    SESSION_CLEANUP_INTERVAL_SECONDS = int(os.getenv("SESSION_CLEANUP_INTERVAL_SECONDS", 60))
+    SESSION_MAX_RESIDENT = int(os.getenv("SESSION_MAX_RESIDENT", 10000))  # LRU limit; 0 disables eviction
+    SESSION_SPILL_PATH = os.getenv("SESSION_SPILL_PATH", "./data/session_spill.db")
+    SESSION_SNAPSHOT_PATH = os.getenv("SESSION_SNAPSHOT_PATH", "./data/sessions.snapshot")
+    SESSION_SNAPSHOT_INTERVAL_SECONDS = int(os.getenv("SESSION_SNAPSHOT_INTERVAL_SECONDS", 300))
+    SESSION_JOURNAL_DIR = os.getenv("SESSION_JOURNAL_DIR", "./data/session_journal")
+    SESSION_JOURNAL_FLUSH_MS = int(os.getenv("SESSION_JOURNAL_FLUSH_MS", 50))  # Group commit interval
+    SESSION_JOURNAL_FLUSH_RECORDS = int(os.getenv("SESSION_JOURNAL_FLUSH_RECORDS", 256))
+    SESSION_JOURNAL_SEGMENT_BYTES = int(os.getenv("SESSION_JOURNAL_SEGMENT_BYTES", 16 * 1024 * 1024))
+    
+    # Database
+    DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./data/career_companion.db")
+    SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "balanced")  # legacy, durable, balanced or fast
+    # Optional overrides of single profile settings (unset keeps the profile's value)
+    SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE") or None
+    SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS") or None
+    SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE")) if os.getenv("SQLITE_MMAP_SIZE") else None
+    SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE")) if os.getenv("SQLITE_CACHE_SIZE") else None  # <0 is KiB
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS")) if os.getenv("SQLITE_BUSY_TIMEOUT_MS") else None
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE")) if os.getenv("DB_POOL_SIZE") else None
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW")) if os.getenv("DB_MAX_OVERFLOW") else None
+    DB_READ_POOL = os.getenv("DB_READ_POOL", "true").lower() == "true"  # Read-only pool for reads (WAL only)
+    
+    # Chat Log Writer
+    CHAT_LOG_BATCH_SIZE = int(os.getenv("CHAT_LOG_BATCH_SIZE", 500))
+    CHAT_LOG_FLUSH_MS = int(os.getenv("CHAT_LOG_FLUSH_MS", 20))
+    CHAT_LOG_QUEUE_MAX = int(os.getenv("CHAT_LOG_QUEUE_MAX", 10000))  # Producers wait beyond this
+    CHAT_LOG_WRITE_RETRIES = int(os.getenv("CHAT_LOG_WRITE_RETRIES", 8))  # Retries of a batch while the DB is locked
+    CHAT_LOG_RETRY_BACKOFF_MS = int(os.getenv("CHAT_LOG_RETRY_BACKOFF_MS", 500))  # Doubled per retry, capped at 30s
+    CHAT_LOG_RETENTION_DAYS = int(os.getenv("CHAT_LOG_RETENTION_DAYS", 0))  # 0 keeps every chat in SQLite
+    CHAT_LOG_RETENTION_INTERVAL_SECONDS = int(os.getenv("CHAT_LOG_RETENTION_INTERVAL_SECONDS", 24 * 60 * 60))
+    CHAT_LOG_ARCHIVE_DIR = os.getenv("CHAT_LOG_ARCHIVE_DIR", "./data/chat_archive")
+    CHAT_EXPORT_BATCH_SIZE = int(os.getenv("CHAT_EXPORT_BATCH_SIZE", 1000))  # Rows per export page
+    
+    # Student Profile Cache
+    PROFILE_CACHE_MAX_ENTRIES = int(os.getenv("PROFILE_CACHE_MAX_ENTRIES", 5000))
+    PROFILE_CACHE_TTL_SECONDS = float(os.getenv("PROFILE_CACHE_TTL_SECONDS", 300))  # 0 disables the cache
+    
+    # Bulk Student Import
+    STUDENT_IMPORT_CHUNK_SIZE = int(os.getenv("STUDENT_IMPORT_CHUNK_SIZE", 1000))  # Rows per transaction
+    
+    # Conversation Summarization
+    SUMMARY_TOKEN_THRESHOLD = int(os.getenv("SUMMARY_TOKEN_THRESHOLD", 1500))  # Unsummarized tokens before folding
+    SUMMARY_KEEP_RECENT = int(os.getenv("SUMMARY_KEEP_RECENT", 4))  # Latest messages always sent verbatim
+    SUMMARY_MAX_TOKENS = 400
     
     # Knowledge Base
     VECTOR_DB_PATH = os.getenv("VECTOR_DB_PATH", "./data/vector_db")
@@ -1,12 +1,14 @@
 """
 FastAPI application for Career Companion chatbot
 """
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse, HTMLResponse
 from fastapi.staticfiles import StaticFiles
 import uvicorn
 from typing import Optional
+from datetime import datetime
+import asyncio
 import os
 import sys
 import logging
@@ -24,14 +26,20 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from backend.config import config
 from backend.models.schemas import (
-    ChatRequest, ChatResponse, MessageRole, DomainType
+    ChatRequest, ChatResponse, MessageRole, DomainType, MatchRequest
 )
 from backend.services.llm_client import llm_client
 from backend.services.session import session_manager
 from backend.services.intent_router import intent_router
 from backend.services.knowledge_base import knowledge_base
 from backend.services.database_service import DatabaseService
-from backend.prompts.system_prompts import get_system_prompt, format_conversation_history
+from backend.services.summarizer import conversation_summarizer
+from backend.services.student_import import detect_format
+from backend.services.chat_export import EXPORT_FORMATS, EXPORT_WRITERS
+from backend.prompts.system_prompts import (
+    get_system_prompt, format_conversation_history, format_conversation_summary,
+    format_student_profile
+)
 
 
 # Initialize FastAPI app
@@ -44,6 +52,9 @@ app = FastAPI(
 # Initialize database service
 db_service = DatabaseService()
 
+# Background tasks for session expiry, snapshots and journal commits
+_background_tasks: list = []
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -68,8 +79,34 @@ async def startup_event():
         print(f"✓ Knowledge base loaded: {stats['total_documents']} documents")
         
         # Initialize database
+        await db_service.start()
         print("✓ Database initialized")
         
+        # Restore sessions from the last snapshot and journal
+        restored = await session_manager.load_snapshot(config.SESSION_SNAPSHOT_PATH)
+        print(f"✓ Sessions restored: {restored}")
+        
+        # Start periodic session expiry, snapshots and journal group commit
+        _background_tasks.extend([
+            asyncio.create_task(
+                session_manager.run_cleanup_loop(config.SESSION_CLEANUP_INTERVAL_SECONDS)
+            ),
+            asyncio.create_task(
+                session_manager.run_snapshot_loop(
+                    config.SESSION_SNAPSHOT_PATH, config.SESSION_SNAPSHOT_INTERVAL_SECONDS
+                )
+            ),
+            asyncio.create_task(session_manager.run_journal_commit_loop())
+        ])
+        
+        # Move old chat logs to the cold archive
+        if config.CHAT_LOG_RETENTION_DAYS > 0:
+            _background_tasks.append(asyncio.create_task(
+                db_service.run_retention_loop(
+                    config.CHAT_LOG_RETENTION_DAYS, config.CHAT_LOG_RETENTION_INTERVAL_SECONDS
+                )
+            ))
+        
     except Exception as e:
         print(f"✗ Startup error: {e}")
         raise
@@ -79,6 +116,13 @@ async def startup_event():
 async def shutdown_event():
     """Cleanup on shutdown"""
     print("Shutting down Career Companion...")
+    for task in _background_tasks:
+        task.cancel()
+    
+    saved = await session_manager.save_snapshot(config.SESSION_SNAPSHOT_PATH)
+    print(f"✓ Sessions saved: {saved}")
+    await session_manager.close()
+    await db_service.close()
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -104,7 +148,11 @@ async def health_check():
     return {
         "status": "healthy",
         "service": "Career Companion",
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "sessions": session_manager.get_stats(),
+        "chat_log_writer": db_service.log_writer.stats(),
+        "profile_cache": db_service.profile_cache.stats(),
+        "database_pools": db_service.pool_stats()
     }
 
 
@@ -128,19 +176,19 @@ async def chat(request: ChatRequest, background_tasks: BackgroundTasks):
         # Get or create session
         session_id = request.session_id
         if not session_id:
-            session_id = session_manager.create_session()
+            session_id = await session_manager.create_session()
         
-        session = session_manager.get_session(session_id)
+        session = await session_manager.get_session(session_id)
         if not session:
-            session_id = session_manager.create_session()
-            session = session_manager.get_session(session_id)
+            session_id = await session_manager.create_session()
+            session = await session_manager.get_session(session_id)
         
         # Update user context if provided
         if request.user_context:
-            session_manager.update_user_context(session_id, **request.user_context)
+            await session_manager.update_user_context(session_id, **request.user_context)
         
         # Add user message to history
-        session_manager.add_message(
+        await session_manager.add_message(
             session_id=session_id,
             role=MessageRole.USER,
             content=request.message
@@ -164,7 +212,7 @@ async def chat(request: ChatRequest, background_tasks: BackgroundTasks):
                 kb_context += f"- {doc.content}\n"
         
         # Get user context
-        user_context = session_manager.get_user_context(session_id)
+        user_context = await session_manager.get_user_context(session_id)
         
         # Generate system prompt with persona
         system_prompt = get_system_prompt(
@@ -177,8 +225,17 @@ async def chat(request: ChatRequest, background_tasks: BackgroundTasks):
         if kb_context:
             system_prompt += kb_context
         
-        # Get conversation history
-        history = session_manager.get_conversation_history(session_id, limit=10)
+        # Add the stored student profile (served from the profile cache)
+        student_id = user_context.get("student_id") if user_context else None
+        if student_id:
+            student = await db_service.get_student(student_id)
+            if student:
+                system_prompt += format_student_profile(student)
+        
+        # Get conversation history; older turns are replaced by the running summary
+        summary, history = await session_manager.get_prompt_history(session_id, limit=10)
+        if summary:
+            system_prompt += format_conversation_summary(summary)
         
         # Generate response
         response_text = await llm_client.generate_response(
@@ -187,7 +244,7 @@ async def chat(request: ChatRequest, background_tasks: BackgroundTasks):
         )
         
         # Add assistant response to history
-        session_manager.add_message(
+        await session_manager.add_message(
             session_id=session_id,
             role=MessageRole.ASSISTANT,
             content=response_text,
@@ -206,10 +263,9 @@ async def chat(request: ChatRequest, background_tasks: BackgroundTasks):
         
         # Detect sentiment and log chat to database
         sentiment = db_service.detect_sentiment(request.message)
-        student_id = user_context.get("student_id") if user_context else None
         
         background_tasks.add_task(
-            db_service.log_chat,
+            db_service.queue_chat_log,
             session_id=session_id,
             user_message=request.message,
             bot_response=response_text,
@@ -220,8 +276,8 @@ async def chat(request: ChatRequest, background_tasks: BackgroundTasks):
             intent=classification.intent
         )
         
-        # Schedule session cleanup in background
-        background_tasks.add_task(session_manager.cleanup_expired_sessions)
+        # Fold older turns into the running summary after the response is sent
+        background_tasks.add_task(conversation_summarizer.maybe_summarize, session_id)
         
         return ChatResponse(
             response=response_text,
@@ -240,7 +296,7 @@ async def chat(request: ChatRequest, background_tasks: BackgroundTasks):
 @app.get("/api/session/{session_id}")
 async def get_session(session_id: str):
     """Get session information"""
-    session = session_manager.get_session(session_id)
+    session = await session_manager.get_session(session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
@@ -251,7 +307,7 @@ async def get_session(session_id: str):
         "year": session.year,
         "target_companies": session.target_companies,
         "target_roles": session.target_roles,
-        "message_count": len(session.conversation_history),
+        "message_count": await session_manager.get_message_count(session_id),
         "created_at": session.created_at,
         "last_activity": session.last_activity
     }
@@ -260,7 +316,7 @@ async def get_session(session_id: str):
 @app.get("/api/session/{session_id}/history")
 async def get_session_history(session_id: str, limit: Optional[int] = None):
     """Get conversation history for a session"""
-    history = session_manager.get_conversation_history(session_id, limit=limit)
+    history = await session_manager.get_conversation_history(session_id, limit=limit)
     if not history:
         raise HTTPException(status_code=404, detail="Session not found or empty")
     
@@ -280,7 +336,7 @@ async def get_session_history(session_id: str, limit: Optional[int] = None):
 @app.delete("/api/session/{session_id}")
 async def delete_session(session_id: str):
     """Delete a session"""
-    success = session_manager.delete_session(session_id)
+    success = await session_manager.delete_session(session_id)
     if not success:
         raise HTTPException(status_code=404, detail="Session not found")
     
@@ -327,7 +383,7 @@ async def create_student(
 ):
     """Create a new student profile"""
     try:
-        student = db_service.create_student(
+        student = await db_service.create_student(
             student_id=student_id,
             name=name,
             department=department,
@@ -346,10 +402,81 @@ async def create_student(
         raise HTTPException(status_code=400, detail=f"Error creating student: {str(e)}")
 
 
+@app.post("/api/students/import")
+async def import_students(request: Request, format: Optional[str] = None, chunk_size: Optional[int] = None):
+    """
+    Bulk create or update student profiles from a CSV or JSONL request body
+    
+    Send the file as the raw body (Content-Type text/csv or application/x-ndjson,
+    or pass format=csv|jsonl). Rows are upserted by student_id in chunked
+    transactions; invalid rows are skipped and listed in "errors".
+    """
+    try:
+        fmt = detect_format(request.headers.get("content-type"), format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        result = await db_service.import_students(request.stream(), fmt=fmt, chunk_size=chunk_size)
+    except Exception as e:
+        logger.error(f"Student import failed: {e}")
+        raise HTTPException(status_code=400, detail=f"Error importing students: {str(e)}")
+    
+    return {"message": "Student import completed", "format": fmt, **result}
+
+
+@app.get("/api/students/search")
+async def search_students(
+    skills: Optional[str] = None,
+    match: str = "all",
+    companies: Optional[str] = None,
+    min_cgpa: Optional[float] = None,
+    max_arrears: Optional[int] = None,
+    department: Optional[str] = None,
+    year: Optional[int] = None,
+    limit: int = 500
+):
+    """
+    Shortlist students by skills and profile criteria
+    
+    skills and companies are comma-separated; match=all requires every skill,
+    match=any at least one. Results are ordered by CGPA, highest first.
+    """
+    if match not in ("all", "any"):
+        raise HTTPException(status_code=400, detail="match must be 'all' or 'any'")
+    
+    students = await db_service.find_students(
+        skills=skills.split(",") if skills else None,
+        match_all_skills=match == "all",
+        companies=companies.split(",") if companies else None,
+        min_cgpa=min_cgpa,
+        max_arrears=max_arrears,
+        department=department,
+        year=year,
+        limit=limit
+    )
+    return {
+        "count": len(students),
+        "students": [
+            {
+                "student_id": s.student_id,
+                "name": s.name,
+                "department": s.department,
+                "cgpa": s.current_cgpa,
+                "arrears_count": s.arrears_count,
+                "year": s.year,
+                "skills": s.skills,
+                "target_companies": s.target_companies
+            }
+            for s in students
+        ]
+    }
+
+
 @app.get("/api/students/{student_id}")
 async def get_student(student_id: str):
     """Get student profile by ID"""
-    student = db_service.get_student(student_id)
+    student = await db_service.get_student(student_id)
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
     
@@ -370,7 +497,7 @@ async def get_student(student_id: str):
 @app.put("/api/students/{student_id}")
 async def update_student(student_id: str, **kwargs):
     """Update student profile"""
-    student = db_service.update_student(student_id, **kwargs)
+    student = await db_service.update_student(student_id, **kwargs)
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
     
@@ -383,7 +510,7 @@ async def update_student(student_id: str, **kwargs):
 @app.delete("/api/students/{student_id}")
 async def delete_student(student_id: str):
     """Delete student profile"""
-    success = db_service.delete_student(student_id)
+    success = await db_service.delete_student(student_id)
     if not success:
         raise HTTPException(status_code=404, detail="Student not found")
     
@@ -391,11 +518,16 @@ async def delete_student(student_id: str):
 
 
 @app.get("/api/students")
-async def list_students(limit: int = 100, offset: int = 0):
-    """List all student profiles"""
-    students = db_service.list_students(limit=limit, offset=offset)
+async def list_students(limit: int = 100, offset: int = 0, cursor: Optional[str] = None):
+    """List student profiles; pass next_cursor back as cursor for the next page"""
+    try:
+        students, next_cursor = await db_service.list_students(limit=limit, offset=offset, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     return {
         "count": len(students),
+        "next_cursor": next_cursor,
         "students": [
             {
                 "student_id": s.student_id,
@@ -409,17 +541,32 @@ async def list_students(limit: int = 100, offset: int = 0):
     }
 
 
+# Placement Matching Endpoints
+@app.post("/api/matching/shortlist")
+async def shortlist_students(request: MatchRequest):
+    """Rank every student against each company's eligibility criteria"""
+    return await db_service.match_students(request.companies)
+
+
 # Chat Analytics Endpoints
 @app.get("/api/analytics/chat-history")
 async def get_chat_history(
     student_id: Optional[str] = None,
     session_id: Optional[str] = None,
-    limit: int = 50
+    limit: int = 50,
+    cursor: Optional[str] = None
 ):
-    """Get chat history"""
-    chats = db_service.get_chat_history(student_id=student_id, session_id=session_id, limit=limit)
+    """Get chat history, newest first; pass next_cursor back as cursor for older chats"""
+    try:
+        chats, next_cursor = await db_service.get_chat_history(
+            student_id=student_id, session_id=session_id, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     return {
         "count": len(chats),
+        "next_cursor": next_cursor,
         "chats": [
             {
                 "id": chat.id,
@@ -438,9 +585,13 @@ async def get_chat_history(
 
 
 @app.get("/api/analytics/sentiment-stats")
-async def get_sentiment_stats(student_id: Optional[str] = None):
+async def get_sentiment_stats(
+    student_id: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+):
     """Get sentiment statistics"""
-    stats = db_service.get_sentiment_stats(student_id=student_id)
+    stats = await db_service.get_sentiment_stats(student_id=student_id, since=since, until=until)
     return {
         "student_id": student_id,
         "sentiment_stats": stats
@@ -448,15 +599,124 @@ async def get_sentiment_stats(student_id: Optional[str] = None):
 
 
 @app.get("/api/analytics/persona-usage")
-async def get_persona_usage(student_id: Optional[str] = None):
+async def get_persona_usage(
+    student_id: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+):
     """Get persona usage statistics"""
-    stats = db_service.get_persona_usage(student_id=student_id)
+    stats = await db_service.get_persona_usage(student_id=student_id, since=since, until=until)
     return {
         "student_id": student_id,
         "persona_usage": stats
     }
 
 
+@app.get("/api/analytics/domain-usage")
+async def get_domain_usage(
+    student_id: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+):
+    """Get domain usage statistics"""
+    stats = await db_service.get_domain_usage(student_id=student_id, since=since, until=until)
+    return {
+        "student_id": student_id,
+        "domain_usage": stats
+    }
+
+
+@app.get("/api/analytics/intent-usage")
+async def get_intent_usage(
+    student_id: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+):
+    """Get intent statistics"""
+    stats = await db_service.get_intent_usage(student_id=student_id, since=since, until=until)
+    return {
+        "student_id": student_id,
+        "intent_usage": stats
+    }
+
+
+@app.get("/api/analytics/activity")
+async def get_activity_timeline(
+    bucket: str = "day",
+    student_id: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+):
+    """Get chat counts per hour, day, week or month"""
+    try:
+        timeline = await db_service.get_activity_timeline(
+            bucket=bucket, student_id=student_id, since=since, until=until
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return {
+        "student_id": student_id,
+        "bucket": bucket,
+        "timeline": timeline
+    }
+
+
+@app.get("/api/analytics/export")
+async def export_chat_logs(
+    format: str = "ndjson",
+    student_id: Optional[str] = None,
+    session_id: Optional[str] = None,
+    domain: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    include_archived: bool = False
+):
+    """Stream matching chat logs, oldest first, as NDJSON or CSV"""
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported format '{format}', use one of: {', '.join(EXPORT_FORMATS)}"
+        )
+    
+    rows = db_service.stream_chat_logs(
+        student_id=student_id, session_id=session_id, domain=domain, since=since, until=until,
+        include_archived=include_archived
+    )
+    extension = "jsonl" if format == "ndjson" else format
+    return StreamingResponse(
+        EXPORT_WRITERS[format](rows),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="chat_logs.{extension}"'}
+    )
+
+
+@app.get("/api/analytics/search")
+async def search_chat_logs(
+    q: str,
+    student_id: Optional[str] = None,
+    domain: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = 20
+):
+    """Full-text search over past conversations, best matches first"""
+    try:
+        results = await db_service.search_chat_logs(
+            q, student_id=student_id, domain=domain, since=since, until=until, limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    return {
+        "query": q,
+        "count": len(results),
+        "results": results
+    }
+
+
 def _get_suggested_actions(domain: DomainType) -> list:
     """Get suggested actions based on domain"""
     actions_map = {
@@ -1,11 +1,19 @@
 """
 Database models for Career Companion AI
 """
+import zlib
 from datetime import datetime
-from typing import Optional
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Text, ForeignKey
+from functools import lru_cache
+from urllib.parse import quote
+from typing import Any, Dict, Optional, Tuple
+from sqlalchemy import (
+    create_engine, event, inspect, Boolean, Column, Integer, LargeBinary, String, Float, DateTime, Text,
+    ForeignKey, Index, text
+)
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 Base = declarative_base()
 
@@ -28,6 +36,13 @@ class StudentProfile(Base):
     # Relationship to chat logs
     chat_logs = relationship("ChatLog", back_populates="student")
     
+    __table_args__ = (
+        # Keyset pagination order for list_students
+        Index("ix_student_profiles_created_student", "created_at", "student_id"),
+        # Shortlists are filtered by and ordered on CGPA
+        Index("ix_student_profiles_cgpa", "current_cgpa", "student_id"),
+    )
+    
     def __repr__(self):
         return f"<StudentProfile(student_id='{self.student_id}', name='{self.name}', cgpa={self.current_cgpa})>"
 
@@ -37,10 +52,11 @@ class ChatLog(Base):
     __tablename__ = "chat_logs"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    student_id = Column(String, ForeignKey("student_profiles.student_id"), nullable=True, index=True)
-    session_id = Column(String, nullable=False, index=True)
+    student_id = Column(String, ForeignKey("student_profiles.student_id"), nullable=True)
+    session_id = Column(String, nullable=False)
     user_message = Column(Text, nullable=False)
-    bot_response = Column(Text, nullable=False)
+    bot_response = Column(Text, nullable=False, default="")  # Inline text of older rows; "" once in response_blobs
+    response_hash = Column(String, nullable=True)  # ResponseBlob holding the response text
     timestamp = Column(DateTime, default=datetime.utcnow, index=True)
     sentiment_detected = Column(String, nullable=True)  # anxious, technical, neutral, confident
     persona_used = Column(String, nullable=True)  # strict_recruiter, supportive_mentor
@@ -50,14 +66,342 @@ class ChatLog(Base):
     # Relationship to student profile
     student = relationship("StudentProfile", back_populates="chat_logs")
     
+    # Filters are combined with ORDER BY timestamp (the rowid id breaks ties), so each
+    # composite index serves both the lookup and the sort without a temp B-tree
+    __table_args__ = (
+        Index("ix_chat_logs_student_time", "student_id", "timestamp"),
+        Index("ix_chat_logs_session_time", "session_id", "timestamp"),
+        Index("ix_chat_logs_domain_time", "domain", "timestamp"),
+        # Only rows written before response_blobs existed; empty once they are migrated
+        Index("ix_chat_logs_inline_response", "id", sqlite_where=text("response_hash IS NULL")),
+    )
+    
     def __repr__(self):
         return f"<ChatLog(id={self.id}, student_id='{self.student_id}', timestamp={self.timestamp})>"
 
 
+class ResponseBlob(Base):
+    """One distinct bot response body, shared by every chat log that sent it"""
+    __tablename__ = "response_blobs"
+    
+    hash = Column(String, primary_key=True)  # blake2b-128 hex digest of the UTF-8 text
+    body = Column(LargeBinary, nullable=False)  # zlib stream, or raw UTF-8 if compression did not help
+    compressed = Column(Boolean, nullable=False, default=True)
+    size = Column(Integer, nullable=False)  # Uncompressed UTF-8 bytes
+    refs = Column(Integer, nullable=False, default=0)  # Referencing chat_logs rows, kept by triggers
+    
+    def __repr__(self):
+        return f"<ResponseBlob(hash='{self.hash}', size={self.size}, refs={self.refs})>"
+
+
+
+class StudentSkill(Base):
+    """One normalized skill of a student, derived from StudentProfile.skills"""
+    __tablename__ = "student_skills"
+    
+    student_id = Column(String, ForeignKey("student_profiles.student_id"), primary_key=True)
+    skill = Column(String, primary_key=True)  # Lowercased, trimmed
+    
+    __table_args__ = (
+        Index("ix_student_skills_skill", "skill", "student_id"),
+    )
+
+
+class StudentTarget(Base):
+    """One normalized target company of a student, derived from StudentProfile.target_companies"""
+    __tablename__ = "student_targets"
+    
+    student_id = Column(String, ForeignKey("student_profiles.student_id"), primary_key=True)
+    company = Column(String, primary_key=True)  # Lowercased, trimmed
+    
+    __table_args__ = (
+        Index("ix_student_targets_company", "company", "student_id"),
+    )
+
+
+class ChatLogRollup(Base):
+    """Hourly chat counts per student, domain, persona, sentiment and intent"""
+    __tablename__ = "chat_log_rollups"
+    
+    # Null values are stored as the analytics defaults so every key column is part of the primary key
+    bucket_hour = Column(String, primary_key=True)  # "YYYY-MM-DD HH:00" (UTC)
+    student_id = Column(String, primary_key=True, default="")  # "" for anonymous chats
+    domain = Column(String, primary_key=True, default="general")
+    persona = Column(String, primary_key=True, default="unknown")
+    sentiment = Column(String, primary_key=True, default="neutral")
+    intent = Column(String, primary_key=True, default="general_query")
+    count = Column(Integer, nullable=False, default=0)
+    
+    __table_args__ = (
+        # Per-student analytics; the primary key already leads with bucket_hour
+        Index("ix_chat_log_rollups_student_bucket", "student_id", "bucket_hour"),
+    )
+    
+    def __repr__(self):
+        return f"<ChatLogRollup(bucket_hour='{self.bucket_hour}', student_id='{self.student_id}', count={self.count})>"
+
+def compress_response(response: str) -> Tuple[bytes, bool]:
+    """
+    Encode a bot response for ResponseBlob.body
+
+    Returns:
+        Tuple of (body, compressed); short or incompressible text is kept as raw UTF-8
+    """
+    raw = response.encode("utf-8")
+    packed = zlib.compress(raw, 6)
+    if len(packed) < len(raw):
+        return packed, True
+    return raw, False
+
+
+@lru_cache(maxsize=256)
+def decompress_response(body: Optional[bytes], compressed: bool) -> Optional[str]:
+    """Decode a ResponseBlob.body back into text (None for a missing blob)"""
+    if body is None:
+        return None
+    return (zlib.decompress(body) if compressed else body).decode("utf-8")
+
+
+# ResponseBlob.refs counts chat_logs rows per blob on every write path; blobs at zero
+# are deleted by retention once the rows referencing them are archived
+RESPONSE_BLOBS_DDL = [
+    """
+    CREATE TRIGGER IF NOT EXISTS response_blobs_ref_insert AFTER INSERT ON chat_logs
+    WHEN new.response_hash IS NOT NULL BEGIN
+        UPDATE response_blobs SET refs = refs + 1 WHERE hash = new.response_hash;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS response_blobs_ref_delete AFTER DELETE ON chat_logs
+    WHEN old.response_hash IS NOT NULL BEGIN
+        UPDATE response_blobs SET refs = refs - 1 WHERE hash = old.response_hash;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS response_blobs_ref_update AFTER UPDATE OF response_hash ON chat_logs BEGIN
+        UPDATE response_blobs SET refs = refs - 1 WHERE hash = old.response_hash;
+        UPDATE response_blobs SET refs = refs + 1 WHERE hash = new.response_hash;
+    END
+    """
+]
+
+# Full response text of a chat_logs row: its blob, or the inline text of an older row.
+# response_text() is registered on every connection (see _register_sqlite_functions).
+_RESPONSE_TEXT = (
+    "COALESCE((SELECT response_text(body, compressed) FROM response_blobs WHERE hash = {row}.response_hash), "
+    "{row}.bot_response)"
+)
+
+# FTS5 index over chat messages. It is an external-content table (text is read from
+# the chat_logs_text view, which resolves response blobs) kept in sync by triggers,
+# so every write path is covered.
+CHAT_LOGS_FTS_DDL = [
+    """
+    CREATE VIEW IF NOT EXISTS chat_logs_text AS
+    SELECT c.id, c.user_message, COALESCE(response_text(b.body, b.compressed), c.bot_response) AS bot_response
+    FROM chat_logs AS c LEFT JOIN response_blobs AS b ON b.hash = c.response_hash
+    """,
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS chat_logs_fts USING fts5(
+        user_message, bot_response,
+        content='chat_logs_text', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS chat_logs_fts_insert AFTER INSERT ON chat_logs BEGIN
+        INSERT INTO chat_logs_fts(rowid, user_message, bot_response)
+        VALUES (new.id, new.user_message, {_RESPONSE_TEXT.format(row="new")});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS chat_logs_fts_delete AFTER DELETE ON chat_logs BEGIN
+        INSERT INTO chat_logs_fts(chat_logs_fts, rowid, user_message, bot_response)
+        VALUES ('delete', old.id, old.user_message, {_RESPONSE_TEXT.format(row="old")});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS chat_logs_fts_update
+    AFTER UPDATE OF user_message, bot_response, response_hash ON chat_logs
+    WHEN new.user_message IS NOT old.user_message
+        OR {_RESPONSE_TEXT.format(row="new")} IS NOT {_RESPONSE_TEXT.format(row="old")} BEGIN
+        INSERT INTO chat_logs_fts(chat_logs_fts, rowid, user_message, bot_response)
+        VALUES ('delete', old.id, old.user_message, {_RESPONSE_TEXT.format(row="old")});
+        INSERT INTO chat_logs_fts(rowid, user_message, bot_response)
+        VALUES (new.id, new.user_message, {_RESPONSE_TEXT.format(row="new")});
+    END
+    """
+]
+
+# The index before response_blobs read chat_logs directly; it is dropped and rebuilt
+_LEGACY_FTS_DROP = [
+    "DROP TRIGGER IF EXISTS chat_logs_fts_insert",
+    "DROP TRIGGER IF EXISTS chat_logs_fts_delete",
+    "DROP TRIGGER IF EXISTS chat_logs_fts_update",
+    "DROP TABLE IF EXISTS chat_logs_fts"
+]
+
+
+def init_full_text_search(engine) -> bool:
+    """
+    Create the chat_logs_fts index and its sync triggers if missing
+
+    A newly created index is filled from the existing chat_logs rows.
+
+    Returns:
+        Whether full-text search is available (SQLite built with FTS5)
+    """
+    if engine.dialect.name != "sqlite":
+        return False
+
+    with engine.begin() as conn:
+        exists = conn.execute(text(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'chat_logs_fts'"
+        )).scalar()
+        if exists and "chat_logs_text" not in exists:
+            for statement in _LEGACY_FTS_DROP:
+                conn.execute(text(statement))
+            exists = None
+        try:
+            for statement in CHAT_LOGS_FTS_DDL:
+                conn.execute(text(statement))
+        except Exception as e:
+            print(f"⚠️  Full-text search disabled (SQLite FTS5 unavailable): {e}")
+            return False
+        if not exists:
+            conn.execute(text("INSERT INTO chat_logs_fts(chat_logs_fts) VALUES ('rebuild')"))
+    return True
+
+
+# SQLite storage profiles: per-connection pragmas plus connection pool sizing.
+# None leaves the SQLite default in place.
+SQLITE_PROFILES: Dict[str, Dict[str, Any]] = {
+    # Pre-profile behaviour: rollback journal, FULL sync, default caches
+    "legacy": {
+        "journal_mode": None, "synchronous": None, "mmap_size": None,
+        "cache_size": None, "busy_timeout": None, "pool_size": 5, "max_overflow": 10
+    },
+    # WAL with an fsync on every commit; survives power loss without losing commits
+    "durable": {
+        "journal_mode": "WAL", "synchronous": "FULL", "mmap_size": 0,
+        "cache_size": -16000, "busy_timeout": 5000, "pool_size": 5, "max_overflow": 10
+    },
+    # WAL fsyncs only at checkpoints; a power cut may lose the last commits, never corrupts
+    "balanced": {
+        "journal_mode": "WAL", "synchronous": "NORMAL", "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -64000, "busy_timeout": 5000, "pool_size": 10, "max_overflow": 20
+    },
+    # No fsync at all; for disposable databases such as benchmarks and demos
+    "fast": {
+        "journal_mode": "WAL", "synchronous": "OFF", "mmap_size": 1024 * 1024 * 1024,
+        "cache_size": -256000, "busy_timeout": 5000, "pool_size": 10, "max_overflow": 20
+    }
+}
+
+# Applied in this order; journal_mode first so later pragmas see the final mode
+SQLITE_PRAGMAS = ["journal_mode", "synchronous", "mmap_size", "cache_size", "busy_timeout"]
+
+
+def storage_settings(profile: str = "balanced", **overrides) -> Dict[str, Any]:
+    """
+    Resolve a storage profile with optional per-setting overrides
+
+    Args:
+        profile: Name from SQLITE_PROFILES
+        **overrides: Settings to replace; None values are ignored
+
+    Raises:
+        ValueError: If the profile is unknown
+    """
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f"Unknown SQLite profile '{profile}', use one of: {', '.join(SQLITE_PROFILES)}")
+
+    settings = dict(SQLITE_PROFILES[profile], profile=profile)
+    settings.update({key: value for key, value in overrides.items() if value is not None})
+    return settings
+
+
+def _is_sqlite_file(database_url: str) -> bool:
+    return database_url.startswith("sqlite") and ":memory:" not in database_url
+
+
+def supports_read_pool(database_url: str, storage: Optional[Dict[str, Any]]) -> bool:
+    """Whether read-only connections can run beside the writer without blocking it (WAL files)"""
+    return (
+        _is_sqlite_file(database_url)
+        and bool(storage)
+        and str(storage.get("journal_mode") or "").upper() == "WAL"
+    )
+
+
+def _read_only_url(database_url: str) -> str:
+    """Rewrite sqlite:///path as a mode=ro SQLite URI for the aiosqlite driver"""
+    path = database_url.split(":///", 1)[1]
+    return f"sqlite+aiosqlite:///file:{quote(path, safe='/:')}?mode=ro&uri=true"
+
+
+def _engine_options(database_url: str, storage: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Pool sizing keyword arguments for create_engine / create_async_engine"""
+    if not storage or not _is_sqlite_file(database_url):
+        return {}
+    return {"pool_size": storage["pool_size"], "max_overflow": storage["max_overflow"]}
+
+
+def _apply_sqlite_pragmas(engine, storage: Optional[Dict[str, Any]], read_only: bool = False):
+    """Run the profile's pragmas on every new connection of a (sync) engine"""
+    if engine.dialect.name != "sqlite":
+        return
+
+    if read_only:
+        # The writer owns the file header and journal mode; readers only tune their caches
+        pragmas = [
+            (name, storage[name]) for name in ("mmap_size", "cache_size", "busy_timeout")
+            if storage.get(name) is not None
+        ]
+    else:
+        # auto_vacuum only takes effect on a new, empty file (it lets retention hand freed
+        # pages back), and must come before journal_mode=WAL, which writes the file header
+        pragmas = [("auto_vacuum", "INCREMENTAL")]
+        if storage:
+            pragmas += [(name, storage[name]) for name in SQLITE_PRAGMAS if storage.get(name) is not None]
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas:
+            cursor.execute(f"PRAGMA {name} = {value}")
+        cursor.close()
+
+
+def register_sqlite_functions(dbapi_connection):
+    """
+    Register the SQL functions used by views and triggers on a DBAPI connection
+
+    Engines from this module do this for every connection; other tools (scripts,
+    a plain sqlite3 connection) need it before writing chat_logs or searching.
+    """
+    dbapi_connection.create_function("response_text", 2, decompress_response, deterministic=True)
+
+
+def _register_sqlite_functions(engine):
+    """Register the SQL functions on every new connection of a (sync) engine"""
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def register_functions(dbapi_connection, connection_record):
+        register_sqlite_functions(dbapi_connection)
+
+
 # Database setup functions
-def get_engine(database_url: str = "sqlite:///./data/career_companion.db"):
-    """Create and return database engine"""
-    return create_engine(database_url, connect_args={"check_same_thread": False})
+def get_engine(database_url: str = "sqlite:///./data/career_companion.db",
+               storage: Optional[Dict[str, Any]] = None):
+    """Create and return database engine configured with a storage profile"""
+    engine = create_engine(
+        database_url, connect_args={"check_same_thread": False}, **_engine_options(database_url, storage)
+    )
+    _apply_sqlite_pragmas(engine, storage)
+    _register_sqlite_functions(engine)
+    return engine
 
 
 def get_session_maker(engine):
@@ -65,8 +409,71 @@ def get_session_maker(engine):
     return sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
-def init_database(database_url: str = "sqlite:///./data/career_companion.db"):
+def get_async_engine(database_url: str = "sqlite:///./data/career_companion.db",
+                     storage: Optional[Dict[str, Any]] = None, read_only: bool = False):
+    """
+    Create and return asyncio database engine (aiosqlite driver for SQLite URLs)
+
+    Args:
+        database_url: SQLAlchemy URL
+        storage: Settings from storage_settings()
+        read_only: Open the SQLite file with mode=ro; requires supports_read_pool()
+
+    Raises:
+        ValueError: If read_only is requested for a database without WAL
+    """
+    options = _engine_options(database_url, storage)
+    if read_only:
+        if not supports_read_pool(database_url, storage):
+            raise ValueError("Read-only pools need a SQLite file database in WAL mode")
+        database_url = _read_only_url(database_url)
+    elif database_url.startswith("sqlite:///"):
+        database_url = database_url.replace("sqlite:///", "sqlite+aiosqlite:///", 1)
+    if options:
+        # aiosqlite defaults to NullPool (a new connection per checkout)
+        options["poolclass"] = AsyncAdaptedQueuePool
+    engine = create_async_engine(database_url, **options)
+    _apply_sqlite_pragmas(engine.sync_engine, storage, read_only)
+    _register_sqlite_functions(engine.sync_engine)
+    return engine
+
+
+def get_async_session_maker(engine):
+    """Create and return asyncio session maker"""
+    # Objects are returned after the session closes, so keep their loaded state
+    return async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+
+# Single-column indexes from before the composite (column, timestamp) indexes, which
+# cover the same lookups; left in place they only slow down every insert
+_SUPERSEDED_INDEXES = [
+    "DROP INDEX IF EXISTS ix_chat_logs_student_id",
+    "DROP INDEX IF EXISTS ix_chat_logs_session_id"
+]
+
+
+def init_database(database_url: str = "sqlite:///./data/career_companion.db",
+                  storage: Optional[Dict[str, Any]] = None):
     """Initialize database and create all tables"""
-    engine = get_engine(database_url)
+    engine = get_engine(database_url, storage)
     Base.metadata.create_all(bind=engine)
+    # create_all skips tables that already exist, so add their new columns and indexes here
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                with engine.begin() as conn:
+                    conn.execute(text(
+                        f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(engine.dialect)}"
+                    ))
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    with engine.begin() as conn:
+        for statement in _SUPERSEDED_INDEXES:
+            conn.execute(text(statement))
+    if engine.dialect.name == "sqlite":
+        with engine.begin() as conn:
+            for statement in RESPONSE_BLOBS_DDL:
+                conn.execute(text(statement))
     return engine
@@ -56,12 +56,15 @@ class ChatResponse(BaseModel):
 class SessionContext(BaseModel):
     """User session context"""
     session_id: str
+    student_id: Optional[str] = None  # Links the session to a stored StudentProfile
     student_name: Optional[str] = None
     major: Optional[str] = None
     year: Optional[int] = None
     target_companies: Optional[List[str]] = None
     target_roles: Optional[List[str]] = None
     conversation_history: List[ChatMessage] = []
+    summary: Optional[str] = None  # Rolling summary of turns folded out of the prompt
+    summary_until: Optional[float] = None  # Epoch timestamp of the last summarized message
     created_at: datetime = Field(default_factory=datetime.now)
     last_activity: datetime = Field(default_factory=datetime.now)
 
@@ -81,3 +84,20 @@ class KnowledgeDocument(BaseModel):
     source: str
     metadata: Dict[str, Any] = {}
     relevance_score: Optional[float] = None
+
+
+class CompanyCriteria(BaseModel):
+    """Eligibility criteria of one company drive"""
+    company: str
+    min_cgpa: Optional[float] = None
+    max_arrears: Optional[int] = None
+    departments: Optional[List[str]] = None  # Any of these; None allows all
+    years: Optional[List[int]] = None  # Any of these; None allows all
+    required_skills: List[str] = []  # Student must have every one
+    preferred_skills: List[str] = []  # Each match raises the ranking
+    limit: int = Field(default=50, ge=1, le=5000)
+
+
+class MatchRequest(BaseModel):
+    """Companies to rank the whole student cohort against"""
+    companies: List[CompanyCriteria] = Field(..., min_length=1)
@@ -282,6 +282,22 @@ Student Query: {query}
 """
 
 
+CONVERSATION_SUMMARY_PROMPT = """
+Update the running summary of a placement-preparation conversation.
+
+Keep facts the mentor needs later: the student's goals, target companies and roles,
+skills and gaps discussed, questions already asked in mock interviews and how the
+student answered, and any advice or roadmap already given. Drop pleasantries.
+Write at most 200 words in compact bullet points.
+
+Previous Summary:
+{previous_summary}
+
+New Conversation Turns:
+{transcript}
+"""
+
+
 KNOWLEDGE_RETRIEVAL_PROMPT = """
 Based on the following retrieved documents from the knowledge base, provide a comprehensive answer to the student's question.
 
@@ -341,6 +357,40 @@ def get_system_prompt(domain: str, user_context: dict = None, persona: str = "su
     return f"{BASE_IDENTITY}{persona_instruction}\n\n{domain_prompt}{context_str}"
 
 
+def format_conversation_summary(summary: str) -> str:
+    """
+    Format the running conversation summary for the system prompt
+    
+    Args:
+        summary: Summary of earlier turns
+    
+    Returns:
+        System prompt section
+    """
+    return f"\n\n**Earlier Conversation (summary):**\n{summary}"
+
+
+def format_student_profile(student) -> str:
+    """
+    Format a stored student profile for the system prompt
+    
+    Args:
+        student: StudentProfile record
+    
+    Returns:
+        System prompt section
+    """
+    parts = [f"Department: {student.department}"]
+    if student.current_cgpa is not None:
+        parts.append(f"CGPA: {student.current_cgpa}")
+    parts.append(f"Active Arrears: {student.arrears_count or 0}")
+    if student.skills:
+        parts.append(f"Skills: {student.skills}")
+    if student.target_companies:
+        parts.append(f"Target Companies: {student.target_companies}")
+    return "\n\n**Student Profile (from records):**\n" + "\n".join(parts)
+
+
 def format_conversation_history(messages: list) -> str:
     """
     Format conversation history for context
@@ -0,0 +1,120 @@
+"""
+Incrementally maintained hourly rollups of chat_logs for analytics
+"""
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from backend.models.database import ChatLog, ChatLogRollup
+
+
+BUCKET_HOUR_FORMAT = "%Y-%m-%d %H:00"
+
+# Rollup value used when a chat_logs column is null
+ROLLUP_DEFAULTS = {
+    "student_id": "",
+    "domain": "general",
+    "persona": "unknown",
+    "sentiment": "neutral",
+    "intent": "general_query"
+}
+
+# chat_logs column feeding each rollup key column
+ROLLUP_SOURCES = {
+    "student_id": ChatLog.student_id,
+    "domain": ChatLog.domain,
+    "persona": ChatLog.persona_used,
+    "sentiment": ChatLog.sentiment_detected,
+    "intent": ChatLog.intent
+}
+
+KEY_COLUMNS = ["bucket_hour"] + list(ROLLUP_DEFAULTS)
+
+
+def to_bucket_hour(moment: datetime) -> str:
+    """Format a timestamp as its hourly rollup bucket"""
+    return moment.strftime(BUCKET_HOUR_FORMAT)
+
+
+def rollup_key(row: Dict[str, Any]) -> tuple:
+    """Rollup key for a chat_logs row given as a dict of ChatLog attributes"""
+    return (
+        to_bucket_hour(row["timestamp"]),
+        row.get("student_id") or ROLLUP_DEFAULTS["student_id"],
+        row.get("domain") or ROLLUP_DEFAULTS["domain"],
+        row.get("persona_used") or ROLLUP_DEFAULTS["persona"],
+        row.get("sentiment_detected") or ROLLUP_DEFAULTS["sentiment"],
+        row.get("intent") or ROLLUP_DEFAULTS["intent"]
+    )
+
+
+async def apply_rollup(db, rows: Iterable[Dict[str, Any]]) -> None:
+    """
+    Add a batch of chat_logs rows to the rollups inside the caller's transaction
+
+    Args:
+        db: Async session that also inserts the rows
+        rows: Inserted rows as dicts of ChatLog attributes (timestamp required)
+    """
+    counts = Counter(rollup_key(row) for row in rows)
+    if not counts:
+        return
+
+    statement = sqlite_insert(ChatLogRollup)
+    statement = statement.on_conflict_do_update(
+        index_elements=KEY_COLUMNS,
+        set_={"count": ChatLogRollup.count + statement.excluded.count}
+    )
+    await db.execute(
+        statement,
+        [dict(zip(KEY_COLUMNS, key), count=count) for key, count in counts.items()]
+    )
+
+
+async def backfill_rollups(db) -> int:
+    """
+    Rebuild all rollups from chat_logs with a single aggregate query
+
+    Args:
+        db: Async session; the caller commits
+
+    Returns:
+        Number of rollup rows written
+    """
+    bucket = func.strftime(BUCKET_HOUR_FORMAT, ChatLog.timestamp)
+    keys = [bucket] + [
+        func.coalesce(column, ROLLUP_DEFAULTS[name]) for name, column in ROLLUP_SOURCES.items()
+    ]
+    source = select(*keys, func.count()).group_by(*keys)
+
+    await db.execute(delete(ChatLogRollup))
+    await db.execute(insert(ChatLogRollup).from_select(KEY_COLUMNS + ["count"], source))
+    return await db.scalar(select(func.count()).select_from(ChatLogRollup))
+
+
+async def rollups_need_backfill(db) -> bool:
+    """Whether chat_logs has rows but the rollup table is empty"""
+    has_logs = await db.scalar(select(ChatLog.id).limit(1))
+    has_rollups = await db.scalar(select(ChatLogRollup.bucket_hour).limit(1))
+    return has_logs is not None and has_rollups is None
+
+
+def bucket_bounds(since: Optional[datetime], until: Optional[datetime]):
+    """
+    Widen a time range to whole hourly rollup buckets
+
+    since rounds down and until rounds up, so a bucket partly inside the
+    range is counted whole: until=now includes the current hour rather
+    than silently dropping it.
+
+    Returns:
+        (first bucket included, first bucket excluded), either None if unbounded
+    """
+    until_bucket = None
+    if until:
+        hour = until.replace(minute=0, second=0, microsecond=0)
+        until_bucket = to_bucket_hour(hour if hour == until else hour + timedelta(hours=1))
+    return to_bucket_hour(since) if since else None, until_bucket
@@ -0,0 +1,270 @@
+"""
+Month-partitioned gzip JSONL archive for chat logs moved out of SQLite
+"""
+import asyncio
+import gzip
+import io
+import json
+import os
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from backend.services.chat_export import EXPORT_COLUMNS
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, run retention in a single process
+    fcntl = None
+
+INDEX_FILE = "index.json"
+LOCK_FILE = "archive.lock"
+
+
+def _month(timestamp: str) -> str:
+    return timestamp[:7]  # "YYYY-MM" of an ISO timestamp
+
+
+class _CommittedBytes(io.RawIOBase):
+    """Read-only view of the first size bytes of a file"""
+
+    def __init__(self, raw, size: int):
+        self._raw = raw
+        self._remaining = size
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        count = min(len(buffer), self._remaining)
+        if count <= 0:
+            return 0
+        data = self._raw.read(count)
+        buffer[:len(data)] = data
+        self._remaining -= len(data)
+        return len(data)
+
+
+class ChatLogArchive:
+    """
+    Cold storage for old chat_logs rows
+
+    Rows live in one gzip JSON-lines file per UTC month. Each archiving
+    pass appends a new gzip member, which readers see as one continuous
+    stream. index.json records per-month row counts and time spans so
+    reads only open the months a time filter can match.
+
+    Saving the index commits a batch. It records each month file's
+    committed size, so bytes from a write that crashed before the index
+    was saved are truncated on the next append, and the ids of the last
+    batch, so a pass that crashed before deleting them from the database
+    can finish the delete instead of archiving them again.
+
+    Every worker process may run retention against the same directory, so
+    writes happen only between lock() and unlock(): an exclusive flock on
+    archive.lock, after which the index is reloaded from disk. Readers
+    load the index afresh and never see another process's uncommitted bytes.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Initialize archive
+
+        Args:
+            directory: Directory holding monthly archive files and the index
+        """
+        self.directory = directory
+        self._index_path = os.path.join(directory, INDEX_FILE)
+        self._lock_fd: Optional[int] = None
+        self.index = self._load_index()
+
+    def _load_index(self) -> Dict[str, Any]:
+        if not os.path.exists(self._index_path):
+            return {"last_archived_id": 0, "months": {}, "pending": None}
+        with open(self._index_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save_index(self) -> None:
+        # Write-then-rename so a crash never leaves a truncated index
+        tmp_path = self._index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.index, f, indent=2, sort_keys=True)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._index_path)
+
+    def lock(self) -> bool:
+        """
+        Take the archive writer lock without waiting and reload the index
+
+        Returns:
+            False if another process (or pass) holds the lock
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        fd = os.open(os.path.join(self.directory, LOCK_FILE), os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                return False
+        self._lock_fd = fd
+        self.index = self._load_index()
+        return True
+
+    def unlock(self) -> None:
+        """Release the writer lock taken by lock()"""
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)  # Closing the descriptor drops the flock
+            self._lock_fd = None
+
+    def _require_lock(self) -> None:
+        if self._lock_fd is None:
+            raise RuntimeError("Archive writes must hold lock()")
+
+    @property
+    def last_archived_id(self) -> int:
+        """Highest chat_logs id written to the archive"""
+        return self.index["last_archived_id"]
+
+    @property
+    def pending(self) -> Optional[Dict[str, Any]]:
+        """Cutoff and ids of the last committed batch, until clear_pending()"""
+        return self.index.get("pending")
+
+    def clear_pending(self) -> None:
+        """Record that the pending batch has been deleted from the database"""
+        self._require_lock()
+        if self.index.get("pending"):
+            self.index["pending"] = None
+            self._save_index()
+
+    def month_path(self, month: str) -> str:
+        """Archive file for a "YYYY-MM" month"""
+        return os.path.join(self.directory, f"chat_logs-{month}.jsonl.gz")
+
+    def append(self, rows: List[Dict[str, Any]], cutoff: str) -> List[int]:
+        """
+        Append rows (ISO string timestamps) to their month files
+
+        Files are fsynced before the index is saved, and the index is saved
+        before the caller deletes the rows, so rows only leave the database
+        once they are durable here. The batch stays pending until
+        clear_pending() or the next append.
+
+        Args:
+            rows: Archived row dicts
+            cutoff: ISO timestamp all rows are older than, kept with the
+                pending ids so a late delete cannot match a newer row that
+                reused an id
+
+        Returns:
+            Ids of the rows written, which the caller must delete
+        """
+        self._require_lock()
+        if not rows:
+            return []
+
+        by_month: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            by_month.setdefault(_month(row["timestamp"]), []).append(row)
+
+        for month, month_rows in by_month.items():
+            entry = self.index["months"].get(month)
+            with open(self.month_path(month), "ab") as raw:
+                # Bytes past the committed size are from a pass that crashed before
+                # saving the index (indexes from older versions do not record sizes)
+                committed = entry.get("bytes", raw.tell()) if entry else 0
+                if raw.tell() > committed:
+                    raw.truncate(committed)
+                with gzip.GzipFile(fileobj=raw, mode="ab") as f:
+                    for row in month_rows:
+                        f.write((json.dumps(row, ensure_ascii=False) + "\n").encode("utf-8"))
+                raw.flush()
+                os.fsync(raw.fileno())
+                size = raw.tell()
+
+            timestamps = [row["timestamp"] for row in month_rows]
+            if entry is None:
+                entry = self.index["months"][month] = {"rows": 0, "first": min(timestamps), "last": max(timestamps)}
+            entry["rows"] += len(month_rows)
+            entry["first"] = min(entry["first"], min(timestamps))
+            entry["last"] = max(entry["last"], max(timestamps))
+            entry["bytes"] = size
+
+        ids = [row["id"] for row in rows]
+        self.index["last_archived_id"] = max(self.last_archived_id, max(ids))
+        self.index["pending"] = {"cutoff": cutoff, "ids": ids}
+        self._save_index()
+        return ids
+
+    def _months_between(self, index: Dict[str, Any], since: Optional[str], until: Optional[str]) -> List[str]:
+        return [
+            month for month, entry in sorted(index["months"].items())
+            if (not since or entry["last"] >= since) and (not until or entry["first"] < until)
+        ]
+
+    def iter_rows(self, student_id: Optional[str] = None, session_id: Optional[str] = None,
+                  domain: Optional[str] = None, since: Optional[datetime] = None,
+                  until: Optional[datetime] = None) -> Iterator[Dict[str, Any]]:
+        """Yield archived rows matching the filters, month by month"""
+        since_text = since.isoformat() if since else None
+        until_text = until.isoformat() if until else None
+        # Another process may have committed since this one last wrote
+        index = self._load_index()
+        for month in self._months_between(index, since_text, until_text):
+            with open(self.month_path(month), "rb") as raw:
+                # Stop at the committed size: bytes past it belong to a pass that
+                # crashed or is still writing (older indexes record no size)
+                size = index["months"][month].get("bytes")
+                committed = io.BufferedReader(_CommittedBytes(raw, size)) if size is not None else raw
+                for line in gzip.open(committed, "rt", encoding="utf-8"):
+                    row = json.loads(line)
+                    if student_id and row["student_id"] != student_id:
+                        continue
+                    if session_id and row["session_id"] != session_id:
+                        continue
+                    if domain and row["domain"] != domain:
+                        continue
+                    if since_text and row["timestamp"] < since_text:
+                        continue
+                    if until_text and row["timestamp"] >= until_text:
+                        continue
+                    yield row
+
+    async def stream_rows(self, batch_size: int = 1000, **filters) -> AsyncIterator[Dict[str, Any]]:
+        """Async version of iter_rows that reads and decompresses off the event loop"""
+        rows = self.iter_rows(**filters)
+
+        def next_batch() -> List[Dict[str, Any]]:
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    break
+            return batch
+
+        while True:
+            batch = await asyncio.to_thread(next_batch)
+            if not batch:
+                return
+            for row in batch:
+                yield row
+
+    def stats(self) -> Dict[str, Any]:
+        """Get archived row counts per month"""
+        index = self._load_index()
+        months = index["months"]
+        pending = index.get("pending")
+        return {
+            "archived_rows": sum(entry["rows"] for entry in months.values()),
+            "months": {month: entry["rows"] for month, entry in sorted(months.items())},
+            "last_archived_id": index["last_archived_id"],
+            "pending_rows": len(pending["ids"]) if pending else 0
+        }
+
+
+def to_archive_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a chat_logs row mapping into its archived JSON form"""
+    archived = {column: row[column] for column in EXPORT_COLUMNS}
+    archived["timestamp"] = row["timestamp"].isoformat()
+    return archived
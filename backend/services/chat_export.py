@@ -0,0 +1,60 @@
+"""
+NDJSON / CSV serialization for streaming chat-log exports
+"""
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv"
+}
+
+EXPORT_COLUMNS = [
+    "id", "timestamp", "student_id", "session_id", "domain", "intent",
+    "persona_used", "sentiment_detected", "user_message", "bot_response"
+]
+
+
+def _plain(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        column: value.isoformat() if isinstance(value, datetime) else value
+        for column, value in ((column, row[column]) for column in EXPORT_COLUMNS)
+    }
+
+
+async def iter_ndjson(rows: AsyncIterator[Dict[str, Any]], flush_rows: int = 500) -> AsyncIterator[str]:
+    """Serialize rows as JSON lines, emitting one string per flush_rows rows"""
+    lines = []
+    async for row in rows:
+        lines.append(json.dumps(_plain(row), ensure_ascii=False) + "\n")
+        if len(lines) >= flush_rows:
+            yield "".join(lines)
+            lines = []
+    if lines:
+        yield "".join(lines)
+
+
+async def iter_csv(rows: AsyncIterator[Dict[str, Any]], flush_rows: int = 500) -> AsyncIterator[str]:
+    """Serialize rows as CSV with a header, emitting one string per flush_rows rows"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    pending = 0
+    async for row in rows:
+        writer.writerow(_plain(row))
+        pending += 1
+        if pending >= flush_rows:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue()
+
+
+EXPORT_WRITERS = {
+    "ndjson": iter_ndjson,
+    "csv": iter_csv
+}
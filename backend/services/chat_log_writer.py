@@ -0,0 +1,185 @@
+"""
+Buffered chat-log writer that bulk-inserts rows in the background
+"""
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.exc import OperationalError
+
+from backend.models.database import ChatLog
+from backend.services.analytics_rollup import apply_rollup
+from backend.services.response_store import store_responses
+
+logger = logging.getLogger(__name__)
+
+# Queue marker telling the writer loop to flush and exit
+_STOP = object()
+
+
+class ChatLogWriter:
+    """
+    Queue of pending chat_logs rows drained by a single background task
+
+    Rows are inserted with one executemany statement and one commit per
+    batch, together with the matching analytics rollup increments. A
+    batch is written once batch_size rows are queued or
+    flush_interval_ms after its first row arrived. The queue is bounded:
+    producers wait when it is full, and those waits are counted as
+    backpressure.
+
+    A batch that fails with OperationalError (typically "database is
+    locked" while a VACUUM holds the file past busy_timeout) is retried
+    with exponential backoff. A batch rejected for any other reason is
+    retried row by row, so only the offending rows are dropped.
+    """
+
+    def __init__(self, session_maker, batch_size: int = 500, flush_interval_ms: int = 20, max_queue: int = 10000,
+                 max_retries: int = 8, retry_backoff_ms: int = 500):
+        """
+        Initialize writer
+
+        Args:
+            session_maker: Async session maker bound to the database
+            batch_size: Maximum rows per insert batch
+            flush_interval_ms: Maximum delay before a partial batch is written
+            max_queue: Maximum rows held in memory before producers wait
+            max_retries: Retries of a batch that hit OperationalError
+            retry_backoff_ms: Delay before the first retry, doubled per retry (capped at 30s)
+        """
+        self.session_maker = session_maker
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_queue = max_queue
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.enqueued = 0
+        self.written = 0
+        self.failed = 0
+        self.retries = 0
+        self.batches = 0
+        self.backpressure_waits = 0
+        self.max_queue_depth = 0
+
+    def start(self) -> None:
+        """Start the background writer task on the running event loop"""
+        if self._task:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._task = asyncio.create_task(self._run())
+
+    async def submit(self, row: Dict[str, Any]) -> None:
+        """
+        Queue one chat_logs row
+
+        Args:
+            row: Column values keyed by ChatLog attribute name
+        """
+        if not self._queue:
+            raise RuntimeError("ChatLogWriter is not running")
+
+        if self._queue.full():
+            self.backpressure_waits += 1
+        await self._queue.put(row)
+        self.enqueued += 1
+        self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+
+    async def flush(self) -> None:
+        """Wait until every queued row has been written"""
+        if self._queue:
+            await self._queue.join()
+
+    async def stop(self) -> None:
+        """Write all queued rows and stop the background task"""
+        if not self._task:
+            return
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+        self._queue = None
+
+    def _drain_into(self, batch: List[Any]) -> None:
+        while len(batch) < self.batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+
+    async def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch = [await self._queue.get()]
+            self._drain_into(batch)
+            if len(batch) < self.batch_size and _STOP not in batch:
+                await asyncio.sleep(self.flush_interval)
+                self._drain_into(batch)
+
+            if _STOP in batch:
+                stopping = True
+                batch.remove(_STOP)
+                self._queue.task_done()
+                # Drain everything still queued before exiting
+                while not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+
+            for start in range(0, len(batch), self.batch_size):
+                await self._write(batch[start:start + self.batch_size])
+
+    async def _write(self, rows: List[Dict[str, Any]]) -> None:
+        if not rows:
+            return
+        try:
+            await self._insert(rows)
+        except Exception as e:
+            if len(rows) == 1 or isinstance(e, OperationalError):
+                self.failed += len(rows)
+                logger.error(f"Chat log batch of {len(rows)} rows failed: {e}")
+            else:
+                logger.warning(f"Chat log batch of {len(rows)} rows failed ({e}), writing rows one by one")
+                for row in rows:
+                    try:
+                        await self._insert([row])
+                    except Exception as row_error:
+                        self.failed += 1
+                        logger.error(f"Chat log row for session {row.get('session_id')} failed: {row_error}")
+        finally:
+            for _ in rows:
+                self._queue.task_done()
+
+    async def _insert(self, rows: List[Dict[str, Any]]) -> None:
+        """Insert rows in one transaction, retrying while the database stays locked"""
+        for attempt in range(self.max_retries + 1):
+            # store_responses rewrites the row dicts, so each attempt gets fresh copies
+            attempt_rows = [dict(row) for row in rows]
+            try:
+                async with self.session_maker() as db:
+                    await store_responses(db, attempt_rows)
+                    await db.execute(insert(ChatLog), attempt_rows)
+                    await apply_rollup(db, attempt_rows)
+                    await db.commit()
+            except OperationalError as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = min(self.retry_backoff * 2 ** attempt, 30)
+                self.retries += 1
+                logger.warning(f"Chat log batch of {len(rows)} rows hit {e.orig}, retrying in {delay:g}s")
+                await asyncio.sleep(delay)
+                continue
+            self.written += len(rows)
+            self.batches += 1
+            return
+
+    def stats(self) -> Dict[str, Any]:
+        """Get throughput and backpressure counters"""
+        return {
+            "queued": self._queue.qsize() if self._queue else 0,
+            "max_queue_depth": self.max_queue_depth,
+            "queue_capacity": self.max_queue,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "failed": self.failed,
+            "retries": self.retries,
+            "batches": self.batches,
+            "avg_batch_size": round(self.written / self.batches, 1) if self.batches else 0,
+            "backpressure_waits": self.backpressure_waits
+        }
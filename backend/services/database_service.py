@@ -1,19 +1,143 @@
 """
 Database service for managing student profiles and chat logs
 """
-from typing import Optional, List, Dict
-from datetime import datetime
+import asyncio
+import base64
+import json
+import logging
+import time
+from typing import Any, AsyncIterator, Iterable, Optional, List, Dict, Tuple
+from datetime import datetime, timedelta
+from sqlalchemy import DateTime, delete, select, func, text, tuple_, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
-from backend.models.database import StudentProfile, ChatLog, get_session_maker, init_database
+from sqlalchemy.orm.attributes import set_committed_value
+from backend.config import config
+from backend.models.database import (
+    StudentProfile, StudentSkill, StudentTarget, ChatLog, ChatLogRollup, ResponseBlob, get_session_maker,
+    init_database, init_full_text_search, get_async_engine, get_async_session_maker, storage_settings,
+    supports_read_pool, decompress_response
+)
+from backend.models.schemas import CompanyCriteria
+from backend.services.analytics_rollup import (
+    apply_rollup, backfill_rollups, rollups_need_backfill, bucket_bounds
+)
+from backend.services.chat_log_writer import ChatLogWriter
+from backend.services.chat_export import EXPORT_COLUMNS
+from backend.services.chat_archive import ChatLogArchive, to_archive_row
+from backend.services.eligibility import CohortMatrix
+from backend.services.pool_metrics import PoolMetrics
+from backend.services.profile_cache import ProfileCache, MISSING
+from backend.services.response_store import store_responses, with_response_bodies, resolve_response
+from backend.services.student_import import iter_records, validate_student
+from backend.services.student_index import (
+    sync_student_tags, delete_student_tags, tags_need_backfill, backfill_student_tags,
+    parse_tags, tag_filter
+)
+
+logger = logging.getLogger(__name__)
+
+
+def encode_cursor(created: datetime, key) -> str:
+    """Encode a keyset position as an opaque URL-safe cursor"""
+    raw = json.dumps([created.isoformat(), key], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, object]:
+    """Decode a cursor produced by encode_cursor (raises ValueError if malformed)"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created, key = json.loads(raw)
+        return datetime.fromisoformat(created), key
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+# SQLite strftime formats for time-bucketed analytics (applied to rollup hour buckets)
+TIME_BUCKET_FORMATS = {
+    "hour": "%Y-%m-%d %H:00",
+    "day": "%Y-%m-%d",
+    "week": "%Y-W%W",
+    "month": "%Y-%m"
+}
+
+
+def to_fts_query(query: str) -> str:
+    """
+    Turn free text into an FTS5 query matching all of its words
+    
+    Each word is quoted so FTS5 operators and punctuation in user input
+    cannot cause syntax errors; a trailing * keeps prefix matching.
+    """
+    terms = []
+    for word in query.split():
+        prefix = word.endswith("*")
+        word = word.rstrip("*").replace('"', '""')
+        if word:
+            terms.append(f'"{word}"' + ("*" if prefix else ""))
+    return " ".join(terms)
 
 
 class DatabaseService:
     """Service for handling database operations"""
     
-    def __init__(self, database_url: str = "sqlite:///./data/career_companion.db"):
-        """Initialize database service"""
-        self.engine = init_database(database_url)
+    def __init__(self, database_url: Optional[str] = None, storage_profile: Optional[str] = None):
+        """
+        Initialize database service
+        
+        Args:
+            database_url: SQLAlchemy URL (defaults to DATABASE_URL)
+            storage_profile: SQLite storage profile (defaults to SQLITE_PROFILE)
+        """
+        database_url = database_url or config.DATABASE_URL
+        self.storage = storage_settings(
+            storage_profile or config.SQLITE_PROFILE,
+            journal_mode=config.SQLITE_JOURNAL_MODE,
+            synchronous=config.SQLITE_SYNCHRONOUS,
+            mmap_size=config.SQLITE_MMAP_SIZE,
+            cache_size=config.SQLITE_CACHE_SIZE,
+            busy_timeout=config.SQLITE_BUSY_TIMEOUT_MS,
+            pool_size=config.DB_POOL_SIZE,
+            max_overflow=config.DB_MAX_OVERFLOW
+        )
+        # Sync engine creates the schema; all queries go through the async engines
+        self.engine = init_database(database_url, self.storage)
+        self.full_text_search = init_full_text_search(self.engine)
         self.SessionLocal = get_session_maker(self.engine)
+        self.read_pool = config.DB_READ_POOL and supports_read_pool(database_url, self.storage)
+        if self.read_pool:
+            # SQLite allows one writer at a time anyway: queue writes on a single connection
+            # and serve analytics, exports and listings from mode=ro connections, which WAL
+            # never blocks behind (or in front of) a commit
+            self.async_engine = get_async_engine(
+                database_url, dict(self.storage, pool_size=1, max_overflow=0)
+            )
+            self.read_engine = get_async_engine(database_url, self.storage, read_only=True)
+        else:
+            self.async_engine = self.read_engine = get_async_engine(database_url, self.storage)
+        self.AsyncSessionLocal = get_async_session_maker(self.async_engine)
+        self.ReadSessionLocal = get_async_session_maker(self.read_engine)
+        self.pool_metrics = {"writer": PoolMetrics("writer", self.async_engine.sync_engine)}
+        if self.read_pool:
+            self.pool_metrics["reader"] = PoolMetrics("reader", self.read_engine.sync_engine)
+        self.log_writer = ChatLogWriter(
+            self.AsyncSessionLocal,
+            batch_size=config.CHAT_LOG_BATCH_SIZE,
+            flush_interval_ms=config.CHAT_LOG_FLUSH_MS,
+            max_queue=config.CHAT_LOG_QUEUE_MAX,
+            max_retries=config.CHAT_LOG_WRITE_RETRIES,
+            retry_backoff_ms=config.CHAT_LOG_RETRY_BACKOFF_MS
+        )
+        self.archive = ChatLogArchive(config.CHAT_LOG_ARCHIVE_DIR)
+        self.profile_cache = ProfileCache(
+            max_entries=config.PROFILE_CACHE_MAX_ENTRIES,
+            ttl_seconds=config.PROFILE_CACHE_TTL_SECONDS
+        )
+        # Columnar snapshot of all profiles for eligibility matching, rebuilt after writes
+        self._cohort: Optional[CohortMatrix] = None
+        self._cohort_built = 0.0
+        self._profile_generation = 0
     
     def get_db(self):
         """Get database session"""
@@ -23,14 +147,52 @@ class DatabaseService:
         finally:
             db.close()
     
+    async def start(self):
+        """
+        Backfill analytics rollups and the skill index if missing, move inline
+        responses of older chat logs into response_blobs and start background workers
+        """
+        async with self.AsyncSessionLocal() as db:
+            needs_backfill = await rollups_need_backfill(db)
+            if await tags_need_backfill(db):
+                await backfill_student_tags(db)
+                await db.commit()
+        if needs_backfill:
+            await self.rebuild_analytics_rollups()
+        if await self.pack_inline_responses():
+            # Emptied rows leave sparse pages that only a full VACUUM compacts (one-time)
+            await asyncio.to_thread(self._incremental_vacuum, True)
+        self.log_writer.start()
+    
+    async def close(self):
+        """Flush pending chat logs and dispose database engines"""
+        await self.log_writer.stop()
+        if self.read_pool:
+            await self.read_engine.dispose()
+        await self.async_engine.dispose()
+        self.engine.dispose()
+    
+    def pool_stats(self) -> Dict[str, Any]:
+        """Get latency metrics for the writer and (when enabled) read-only pools"""
+        return {
+            "read_pool": self.read_pool,
+            **{name: metrics.stats() for name, metrics in self.pool_metrics.items()}
+        }
+    
+    def _profiles_changed(self, student_ids: Iterable[str]):
+        """Drop cached copies of profiles that were just written"""
+        for student_id in student_ids:
+            self.profile_cache.invalidate(student_id)
+        self._profile_generation += 1
+        self._cohort = None
+    
     # Student Profile Operations
-    def create_student(self, student_id: str, name: str, department: str, 
-                      cgpa: Optional[float] = None, skills: Optional[str] = None,
-                      arrears_count: int = 0, year: Optional[int] = None,
-                      target_companies: Optional[str] = None) -> StudentProfile:
+    async def create_student(self, student_id: str, name: str, department: str, 
+                             cgpa: Optional[float] = None, skills: Optional[str] = None,
+                             arrears_count: int = 0, year: Optional[int] = None,
+                             target_companies: Optional[str] = None) -> StudentProfile:
         """Create a new student profile"""
-        db = self.SessionLocal()
-        try:
+        async with self.AsyncSessionLocal() as db:
             student = StudentProfile(
                 student_id=student_id,
                 name=name,
@@ -42,130 +204,680 @@ class DatabaseService:
                 target_companies=target_companies
             )
             db.add(student)
-            db.commit()
-            db.refresh(student)
-            return student
-        finally:
-            db.close()
+            await db.flush()
+            await sync_student_tags(db, [{
+                "student_id": student_id, "skills": skills, "target_companies": target_companies
+            }])
+            await db.commit()
+            await db.refresh(student)
+        self._profiles_changed([student_id])
+        return student
     
-    def get_student(self, student_id: str) -> Optional[StudentProfile]:
-        """Get student profile by ID"""
-        db = self.SessionLocal()
-        try:
-            return db.query(StudentProfile).filter(StudentProfile.student_id == student_id).first()
-        finally:
-            db.close()
+    async def get_student(self, student_id: str) -> Optional[StudentProfile]:
+        """
+        Get student profile by ID
+        
+        Served from the profile cache when possible. The returned object is
+        detached and shared with other callers, so treat it as read-only and
+        go through update_student for changes.
+        """
+        student = self.profile_cache.get(student_id)
+        if student is not MISSING:
+            return student
+        
+        generation = self._profile_generation
+        async with self.ReadSessionLocal() as db:
+            student = await db.get(StudentProfile, student_id)
+        # A write that landed while loading may have invalidated what was read
+        if generation == self._profile_generation:
+            self.profile_cache.put(student_id, student)
+        return student
     
-    def update_student(self, student_id: str, **kwargs) -> Optional[StudentProfile]:
+    async def update_student(self, student_id: str, **kwargs) -> Optional[StudentProfile]:
         """Update student profile"""
-        db = self.SessionLocal()
-        try:
-            student = db.query(StudentProfile).filter(StudentProfile.student_id == student_id).first()
+        async with self.AsyncSessionLocal() as db:
+            student = await db.get(StudentProfile, student_id)
             if student:
                 for key, value in kwargs.items():
                     if hasattr(student, key) and value is not None:
                         setattr(student, key, value)
                 student.updated_at = datetime.utcnow()
-                db.commit()
-                db.refresh(student)
-            return student
-        finally:
-            db.close()
+                await sync_student_tags(db, [{"student_id": student_id, **{
+                    field: kwargs[field] for field in ("skills", "target_companies")
+                    if kwargs.get(field) is not None
+                }}])
+                await db.commit()
+                await db.refresh(student)
+        self._profiles_changed([student_id])
+        return student
     
-    def delete_student(self, student_id: str) -> bool:
+    async def delete_student(self, student_id: str) -> bool:
         """Delete student profile"""
-        db = self.SessionLocal()
-        try:
-            student = db.query(StudentProfile).filter(StudentProfile.student_id == student_id).first()
-            if student:
-                db.delete(student)
-                db.commit()
-                return True
-            return False
-        finally:
-            db.close()
+        async with self.AsyncSessionLocal() as db:
+            student = await db.get(StudentProfile, student_id)
+            if not student:
+                return False
+            await delete_student_tags(db, student_id)
+            await db.delete(student)
+            await db.commit()
+        self._profiles_changed([student_id])
+        return True
     
-    def list_students(self, limit: int = 100, offset: int = 0) -> List[StudentProfile]:
-        """List all student profiles"""
-        db = self.SessionLocal()
-        try:
-            return db.query(StudentProfile).offset(offset).limit(limit).all()
-        finally:
-            db.close()
+    async def import_students(self, chunks: AsyncIterator[bytes], fmt: str = "jsonl",
+                              chunk_size: Optional[int] = None, max_errors: int = 1000) -> Dict[str, Any]:
+        """
+        Bulk upsert student profiles from a CSV or JSONL byte stream
+        
+        The stream is parsed incrementally and valid rows are upserted in
+        chunks, one executemany statement and one commit per chunk. Rows
+        that fail validation are skipped and reported.
+        
+        Args:
+            chunks: Async iterator of raw body bytes
+            fmt: "csv" (header row required) or "jsonl"
+            chunk_size: Rows per transaction (defaults to STUDENT_IMPORT_CHUNK_SIZE)
+            max_errors: Maximum per-row errors included in the result
+        
+        Returns:
+            Counts, per-row errors and throughput
+        """
+        chunk_size = chunk_size or config.STUDENT_IMPORT_CHUNK_SIZE
+        started = time.perf_counter()
+        result = {"processed": 0, "imported": 0, "failed": 0, "chunks": 0, "errors": []}
+        
+        batch: List[Dict[str, Any]] = []
+        async for line_no, record in iter_records(chunks, fmt):
+            result["processed"] += 1
+            try:
+                if isinstance(record, ValueError):
+                    raise record
+                batch.append(validate_student(record))
+            except ValueError as e:
+                result["failed"] += 1
+                if len(result["errors"]) < max_errors:
+                    result["errors"].append({"line": line_no, "error": str(e)})
+                continue
+            
+            if len(batch) >= chunk_size:
+                await self._upsert_students(batch)
+                result["imported"] += len(batch)
+                result["chunks"] += 1
+                batch = []
+        
+        if batch:
+            await self._upsert_students(batch)
+            result["imported"] += len(batch)
+            result["chunks"] += 1
+        
+        elapsed = time.perf_counter() - started
+        result["elapsed_seconds"] = round(elapsed, 3)
+        result["rows_per_second"] = round(result["imported"] / elapsed, 1) if elapsed else 0
+        return result
+    
+    async def _upsert_students(self, rows: List[Dict[str, Any]]):
+        """
+        Insert or update a chunk of student rows in one transaction
+        
+        Rows only carry the columns present in the input; an existing
+        profile keeps its values for the others. A student repeated in the
+        chunk ends up as if its rows were applied in order.
+        """
+        now = datetime.utcnow()
+        # A student repeated in the chunk is applied in file order: later fields win
+        merged: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            merged.setdefault(row["student_id"], {}).update(row)
+        rows = list(merged.values())
+        
+        # executemany needs the same columns on every row
+        groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+        for row in rows:
+            row["created_at"] = row["updated_at"] = now
+            groups.setdefault(tuple(sorted(row)), []).append(row)
+        
+        async with self.AsyncSessionLocal() as db:
+            for columns, group in groups.items():
+                statement = sqlite_insert(StudentProfile)
+                statement = statement.on_conflict_do_update(
+                    index_elements=[StudentProfile.student_id],
+                    set_={
+                        column: statement.excluded[column]
+                        for column in columns if column not in ("student_id", "created_at")
+                    }
+                )
+                await db.execute(statement, group)
+            await sync_student_tags(db, rows)
+            await db.commit()
+        self._profiles_changed(row["student_id"] for row in rows)
+    
+    async def list_students(self, limit: int = 100, offset: int = 0,
+                            cursor: Optional[str] = None) -> Tuple[List[StudentProfile], Optional[str]]:
+        """
+        List student profiles ordered by (created_at, student_id)
+        
+        Pass the returned cursor back to get the next page; its cost does not
+        grow with page depth. offset is kept for older clients.
+        
+        Returns:
+            Tuple of (students, next page cursor or None on the last page)
+        """
+        query = select(StudentProfile)
+        if cursor:
+            created_at, student_id = decode_cursor(cursor)
+            query = query.where(
+                tuple_(StudentProfile.created_at, StudentProfile.student_id) > tuple_(created_at, student_id)
+            )
+        elif offset:
+            query = query.offset(offset)
+        
+        query = query.order_by(StudentProfile.created_at, StudentProfile.student_id).limit(limit)
+        async with self.ReadSessionLocal() as db:
+            students = list(await db.scalars(query))
+        
+        next_cursor = None
+        if students and len(students) == limit:
+            next_cursor = encode_cursor(students[-1].created_at, students[-1].student_id)
+        return students, next_cursor
+    
+    async def find_students(self, skills: Optional[List[str]] = None, match_all_skills: bool = True,
+                            companies: Optional[List[str]] = None,
+                            min_cgpa: Optional[float] = None, max_arrears: Optional[int] = None,
+                            department: Optional[str] = None, year: Optional[int] = None,
+                            limit: int = 500) -> List[StudentProfile]:
+        """
+        Shortlist students by indexed skills, target companies and profile fields
+        
+        Args:
+            skills: Skills to look for (case-insensitive)
+            match_all_skills: Require every skill (AND) instead of any (OR)
+            companies: Keep students targeting any of these companies
+            min_cgpa: Minimum CGPA
+            max_arrears: Maximum active arrears
+            department: Exact department
+            year: Exact year
+            limit: Maximum results
+        
+        Returns:
+            Matching profiles, highest CGPA first
+        """
+        query = select(StudentProfile)
+        skill_tags = parse_tags(",".join(skills or []))
+        if skill_tags:
+            query = query.where(StudentProfile.student_id.in_(
+                tag_filter(StudentSkill, "skill", skill_tags, match_all_skills)
+            ))
+        company_tags = parse_tags(",".join(companies or []))
+        if company_tags:
+            query = query.where(StudentProfile.student_id.in_(
+                tag_filter(StudentTarget, "company", company_tags, match_all=False)
+            ))
+        if min_cgpa is not None:
+            query = query.where(StudentProfile.current_cgpa >= min_cgpa)
+        if max_arrears is not None:
+            query = query.where(StudentProfile.arrears_count <= max_arrears)
+        if department:
+            query = query.where(StudentProfile.department == department)
+        if year is not None:
+            query = query.where(StudentProfile.year == year)
+        
+        query = query.order_by(StudentProfile.current_cgpa.desc(), StudentProfile.student_id.desc()).limit(limit)
+        async with self.ReadSessionLocal() as db:
+            return list(await db.scalars(query))
+    
+    async def get_cohort(self) -> CohortMatrix:
+        """
+        Get the columnar cohort used for eligibility matching
+        
+        Built from all profiles and the skill index on first use, then reused
+        until a profile write or PROFILE_CACHE_TTL_SECONDS have passed.
+        """
+        ttl = config.PROFILE_CACHE_TTL_SECONDS
+        if self._cohort is not None and time.monotonic() - self._cohort_built < ttl:
+            return self._cohort
+        
+        generation = self._profile_generation
+        async with self.ReadSessionLocal() as db:
+            result = await db.execute(select(
+                StudentProfile.student_id, StudentProfile.name, StudentProfile.department,
+                StudentProfile.current_cgpa, StudentProfile.arrears_count, StudentProfile.year
+            ))
+            profiles = [dict(row) for row in result.mappings()]
+            skills = (await db.execute(select(StudentSkill.student_id, StudentSkill.skill))).all()
+        
+        cohort = await asyncio.to_thread(CohortMatrix, profiles, skills)
+        # A write that landed while loading makes this snapshot stale; use it once only
+        if generation == self._profile_generation:
+            self._cohort, self._cohort_built = cohort, time.monotonic()
+        return cohort
+    
+    async def match_students(self, companies: List[CompanyCriteria]) -> Dict[str, Any]:
+        """
+        Rank the whole student cohort against each company's criteria
+        
+        Args:
+            companies: Eligibility criteria per company drive
+        
+        Returns:
+            Cohort size, timing and a ranked shortlist per company
+        """
+        cohort = await self.get_cohort()
+        started = time.perf_counter()
+        results = await asyncio.to_thread(lambda: [cohort.match(criteria) for criteria in companies])
+        return {
+            "cohort_size": cohort.size,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+            "results": results
+        }
     
     # Chat Log Operations
-    def log_chat(self, session_id: str, user_message: str, bot_response: str,
-                 student_id: Optional[str] = None, sentiment: Optional[str] = None,
-                 persona: Optional[str] = None, domain: Optional[str] = None,
-                 intent: Optional[str] = None) -> ChatLog:
+    async def log_chat(self, session_id: str, user_message: str, bot_response: str,
+                       student_id: Optional[str] = None, sentiment: Optional[str] = None,
+                       persona: Optional[str] = None, domain: Optional[str] = None,
+                       intent: Optional[str] = None) -> ChatLog:
         """Log a chat interaction"""
-        db = self.SessionLocal()
-        try:
-            chat_log = ChatLog(
-                student_id=student_id,
-                session_id=session_id,
-                user_message=user_message,
-                bot_response=bot_response,
-                sentiment_detected=sentiment,
-                persona_used=persona,
-                domain=domain,
-                intent=intent
-            )
+        async with self.AsyncSessionLocal() as db:
+            row = {
+                "student_id": student_id,
+                "session_id": session_id,
+                "user_message": user_message,
+                "bot_response": bot_response,
+                "sentiment_detected": sentiment,
+                "persona_used": persona,
+                "domain": domain,
+                "intent": intent,
+                "timestamp": datetime.utcnow()
+            }
+            await store_responses(db, [row])
+            chat_log = ChatLog(**row)
             db.add(chat_log)
-            db.commit()
-            db.refresh(chat_log)
+            await apply_rollup(db, [{
+                "timestamp": chat_log.timestamp,
+                "student_id": student_id,
+                "domain": domain,
+                "persona_used": persona,
+                "sentiment_detected": sentiment,
+                "intent": intent
+            }])
+            await db.commit()
+            await db.refresh(chat_log)
+            set_committed_value(chat_log, "bot_response", bot_response)
             return chat_log
-        finally:
-            db.close()
     
-    def get_chat_history(self, student_id: Optional[str] = None, 
-                        session_id: Optional[str] = None,
-                        limit: int = 50) -> List[ChatLog]:
-        """Get chat history by student or session"""
-        db = self.SessionLocal()
+    async def queue_chat_log(self, session_id: str, user_message: str, bot_response: str,
+                             student_id: Optional[str] = None, sentiment: Optional[str] = None,
+                             persona: Optional[str] = None, domain: Optional[str] = None,
+                             intent: Optional[str] = None):
+        """Queue a chat interaction for the batched log writer"""
+        await self.log_writer.submit({
+            "student_id": student_id,
+            "session_id": session_id,
+            "user_message": user_message,
+            "bot_response": bot_response,
+            "timestamp": datetime.utcnow(),
+            "sentiment_detected": sentiment,
+            "persona_used": persona,
+            "domain": domain,
+            "intent": intent
+        })
+    
+    async def get_chat_history(self, student_id: Optional[str] = None, 
+                               session_id: Optional[str] = None,
+                               limit: int = 50,
+                               cursor: Optional[str] = None) -> Tuple[List[ChatLog], Optional[str]]:
+        """
+        Get chat history by student or session, newest first by (timestamp, id)
+        
+        Returns:
+            Tuple of (chat logs, cursor for the next older page or None)
+        """
+        query = with_response_bodies(select(ChatLog))
+        if student_id:
+            query = query.where(ChatLog.student_id == student_id)
+        if session_id:
+            query = query.where(ChatLog.session_id == session_id)
+        if cursor:
+            timestamp, chat_id = decode_cursor(cursor)
+            query = query.where(tuple_(ChatLog.timestamp, ChatLog.id) < tuple_(timestamp, chat_id))
+        
+        query = query.order_by(ChatLog.timestamp.desc(), ChatLog.id.desc()).limit(limit)
+        async with self.ReadSessionLocal() as db:
+            rows = (await db.execute(query)).all()
+        
+        chats = []
+        for chat, stored_hash, body, compressed in rows:
+            if stored_hash is not None and body is not None:
+                set_committed_value(chat, "bot_response", decompress_response(body, compressed))
+            chats.append(chat)
+        
+        next_cursor = None
+        if chats and len(chats) == limit:
+            next_cursor = encode_cursor(chats[-1].timestamp, chats[-1].id)
+        return chats, next_cursor
+    
+    async def stream_chat_logs(self, student_id: Optional[str] = None,
+                               session_id: Optional[str] = None,
+                               domain: Optional[str] = None,
+                               since: Optional[datetime] = None,
+                               until: Optional[datetime] = None,
+                               batch_size: Optional[int] = None,
+                               include_archived: bool = False) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Iterate chat logs oldest first without loading them all into memory
+        
+        Rows are fetched batch_size at a time by keyset on (timestamp, id),
+        each page in its own short read, so a slow download never holds a
+        transaction open. Rows are yielded as plain column mappings.
+        Archived rows, which are all older than the ones still in the
+        database, come first when requested.
+        
+        Args:
+            student_id: Filter by student
+            session_id: Filter by session
+            domain: Filter by domain
+            since: Include chats at or after this time
+            until: Include chats before this time
+            batch_size: Rows fetched per page
+            include_archived: Also read rows moved to the cold archive
+        """
+        batch_size = batch_size or config.CHAT_EXPORT_BATCH_SIZE
+        if include_archived:
+            async for row in self.archive.stream_rows(
+                batch_size, student_id=student_id, session_id=session_id,
+                domain=domain, since=since, until=until
+            ):
+                yield row
+        
+        query = with_response_bodies(select(*(getattr(ChatLog, column) for column in EXPORT_COLUMNS)))
+        if student_id:
+            query = query.where(ChatLog.student_id == student_id)
+        if session_id:
+            query = query.where(ChatLog.session_id == session_id)
+        if domain:
+            query = query.where(ChatLog.domain == domain)
+        if since:
+            query = query.where(ChatLog.timestamp >= since)
+        if until:
+            query = query.where(ChatLog.timestamp < until)
+        query = query.order_by(ChatLog.timestamp, ChatLog.id).limit(batch_size)
+        
+        page = query
+        while True:
+            async with self.ReadSessionLocal() as db:
+                rows = (await db.execute(page)).mappings().all()
+            for row in rows:
+                yield resolve_response(row)
+            if len(rows) < batch_size:
+                break
+            last = rows[-1]
+            page = query.where(tuple_(ChatLog.timestamp, ChatLog.id) > tuple_(last["timestamp"], last["id"]))
+    
+    async def pack_inline_responses(self, batch_size: int = 1000) -> int:
+        """
+        Move bot responses stored inline by older versions into response_blobs
+        
+        Safe to interrupt: each batch commits on its own and the next pass
+        picks up the rows still without a response_hash.
+        
+        Returns:
+            Number of chat logs moved
+        """
+        packed = 0
+        while True:
+            async with self.AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(ChatLog.id, ChatLog.bot_response)
+                    .where(ChatLog.response_hash.is_(None))
+                    .order_by(ChatLog.id)
+                    .limit(batch_size)
+                )
+                rows = [dict(row) for row in result.mappings()]
+                if not rows:
+                    break
+                await store_responses(db, rows)
+                await db.execute(update(ChatLog), rows)
+                await db.commit()
+            packed += len(rows)
+        if packed:
+            logger.info(f"Moved {packed} inline chat responses into response_blobs")
+        return packed
+    
+    async def archive_chat_logs(self, older_than_days: int, batch_size: int = 5000) -> Dict[str, Any]:
+        """
+        Move chat logs older than the cutoff into the monthly cold archive
+        
+        Each batch is written and fsynced to the archive before it is
+        deleted from chat_logs; a batch whose delete was interrupted is
+        deleted on the next pass rather than archived again. Rollups are
+        left alone, so analytics still count archived chats. Response
+        blobs no longer referenced are dropped, and freed pages are then
+        returned to the OS with an incremental vacuum. Workers share the
+        archive through a file lock; a pass that finds it taken is skipped.
+        
+        Args:
+            older_than_days: Archive chats older than this many days
+            batch_size: Rows moved per transaction
+        
+        Returns:
+            Rows archived and pages freed
+        """
+        cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+        if not await asyncio.to_thread(self.archive.lock):
+            logger.info("Chat log archive is locked by another worker, skipping this pass")
+            return {"archived": 0, "cutoff": cutoff.isoformat(), "pages_freed": 0}
         try:
-            query = db.query(ChatLog)
-            if student_id:
-                query = query.filter(ChatLog.student_id == student_id)
-            if session_id:
-                query = query.filter(ChatLog.session_id == session_id)
-            return query.order_by(ChatLog.timestamp.desc()).limit(limit).all()
+            archived = await self._archive_batches(cutoff, batch_size)
         finally:
-            db.close()
+            self.archive.unlock()
+        
+        if archived:
+            async with self.AsyncSessionLocal() as db:
+                await db.execute(delete(ResponseBlob).where(ResponseBlob.refs <= 0))
+                await db.commit()
+        freed = await asyncio.to_thread(self._incremental_vacuum) if archived else 0
+        return {"archived": archived, "cutoff": cutoff.isoformat(), "pages_freed": freed}
     
-    def get_sentiment_stats(self, student_id: Optional[str] = None) -> Dict[str, int]:
-        """Get sentiment statistics"""
-        db = self.SessionLocal()
+    async def _archive_batches(self, cutoff: datetime, batch_size: int) -> int:
+        """Move chats older than cutoff into the archive; the caller holds the archive lock"""
+        columns = [getattr(ChatLog, column) for column in EXPORT_COLUMNS]
+        archived = 0
+        
+        # Finish the delete of a batch archived by a pass that was interrupted
+        pending = self.archive.pending
+        if pending:
+            async with self.AsyncSessionLocal() as db:
+                result = await db.execute(delete(ChatLog).where(
+                    ChatLog.id.in_(pending["ids"]),
+                    ChatLog.timestamp < datetime.fromisoformat(pending["cutoff"])
+                ))
+                await db.commit()
+            archived += result.rowcount
+            await asyncio.to_thread(self.archive.clear_pending)
+        
+        while True:
+            async with self.AsyncSessionLocal() as db:
+                result = await db.execute(with_response_bodies(
+                    select(*columns).where(ChatLog.timestamp < cutoff)
+                    .order_by(ChatLog.timestamp, ChatLog.id).limit(batch_size)
+                ))
+                rows = [to_archive_row(resolve_response(row)) for row in result.mappings()]
+                if not rows:
+                    break
+                
+                ids = await asyncio.to_thread(self.archive.append, rows, cutoff.isoformat())
+                await db.execute(delete(ChatLog).where(ChatLog.id.in_(ids)))
+                await db.commit()
+                archived += len(ids)
+        
+        if archived:
+            await asyncio.to_thread(self.archive.clear_pending)
+        return archived
+    
+    def _incremental_vacuum(self, full: bool = False) -> int:
+        """
+        Release free pages, converting the file to incremental auto-vacuum once if needed
+        
+        Args:
+            full: Rebuild the whole file with VACUUM, which also compacts pages left
+                half empty by large updates
+        
+        Returns:
+            Number of pages the file shrank by
+        """
+        # executescript steps the pragma to completion; execute() frees a single page
+        raw = self.engine.raw_connection()
         try:
-            query = db.query(ChatLog)
-            if student_id:
-                query = query.filter(ChatLog.student_id == student_id)
-            
-            chats = query.all()
-            stats = {}
-            for chat in chats:
-                sentiment = chat.sentiment_detected or "neutral"
-                stats[sentiment] = stats.get(sentiment, 0) + 1
-            return stats
+            conn = raw.driver_connection
+            pages_before = conn.execute("PRAGMA page_count").fetchone()[0]
+            if full or conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                # auto_vacuum mode only takes effect after a full VACUUM
+                conn.executescript("PRAGMA auto_vacuum = INCREMENTAL; VACUUM;")
+            else:
+                conn.executescript("PRAGMA incremental_vacuum;")
+            # In WAL mode the file only shrinks once the WAL is checkpointed into it
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+            return pages_before - conn.execute("PRAGMA page_count").fetchone()[0]
         finally:
-            db.close()
+            raw.close()
+    
+    async def run_retention_loop(self, older_than_days: int, interval_seconds: int):
+        """
+        Periodically archive old chat logs until cancelled
+        
+        Args:
+            older_than_days: Archive chats older than this many days
+            interval_seconds: Delay between retention passes
+        """
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                result = await self.archive_chat_logs(older_than_days)
+                if result["archived"]:
+                    logger.info(f"Archived {result['archived']} chat logs, freed {result['pages_freed']} pages")
+            except Exception as e:
+                logger.error(f"Chat log retention failed: {e}")
+    
+    async def search_chat_logs(self, query: str, student_id: Optional[str] = None,
+                               domain: Optional[str] = None,
+                               since: Optional[datetime] = None,
+                               until: Optional[datetime] = None,
+                               limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Full-text search over chat messages, best matches first
+        
+        Args:
+            query: Words to match (all must appear; word* for prefix matches)
+            student_id: Filter by student
+            domain: Filter by domain
+            since: Include chats at or after this time
+            until: Include chats before this time
+            limit: Maximum results
+        
+        Returns:
+            Matching chats with bm25 rank and highlighted snippets
+        """
+        if not self.full_text_search:
+            raise RuntimeError("Full-text search is not available in this SQLite build")
+        
+        match = to_fts_query(query)
+        if not match:
+            raise ValueError("Search query is empty")
+        
+        conditions = ["chat_logs_fts MATCH :match"]
+        params: Dict[str, Any] = {"match": match, "limit": limit}
+        if student_id:
+            conditions.append("c.student_id = :student_id")
+            params["student_id"] = student_id
+        if domain:
+            conditions.append("c.domain = :domain")
+            params["domain"] = domain
+        if since:
+            conditions.append("c.timestamp >= :since")
+            params["since"] = since.isoformat(sep=" ")
+        if until:
+            conditions.append("c.timestamp < :until")
+            params["until"] = until.isoformat(sep=" ")
+        
+        statement = text(f"""
+            SELECT c.id, c.student_id, c.session_id, c.domain, c.timestamp,
+                   bm25(chat_logs_fts) AS rank,
+                   snippet(chat_logs_fts, 0, '[', ']', '…', 12) AS user_snippet,
+                   snippet(chat_logs_fts, 1, '[', ']', '…', 16) AS response_snippet
+            FROM chat_logs_fts JOIN chat_logs AS c ON c.id = chat_logs_fts.rowid
+            WHERE {" AND ".join(conditions)}
+            ORDER BY rank
+            LIMIT :limit
+        """).columns(timestamp=DateTime)
+        async with self.ReadSessionLocal() as db:
+            result = await db.execute(statement, params)
+            return [dict(row) for row in result.mappings()]
+    
+    async def rebuild_analytics_rollups(self) -> int:
+        """Backfill analytics rollups from the full chat_logs table"""
+        async with self.AsyncSessionLocal() as db:
+            rows = await backfill_rollups(db)
+            await db.commit()
+            return rows
+    
+    def _apply_rollup_filters(self, query, student_id: Optional[str] = None,
+                              since: Optional[datetime] = None, until: Optional[datetime] = None):
+        """Restrict a rollup query by student and time range, widened to whole hours"""
+        since_bucket, until_bucket = bucket_bounds(since, until)
+        if student_id:
+            query = query.where(ChatLogRollup.student_id == student_id)
+        if since_bucket:
+            query = query.where(ChatLogRollup.bucket_hour >= since_bucket)
+        if until_bucket:
+            query = query.where(ChatLogRollup.bucket_hour < until_bucket)
+        return query
     
-    def get_persona_usage(self, student_id: Optional[str] = None) -> Dict[str, int]:
+    async def _count_by(self, column, student_id: Optional[str] = None,
+                        since: Optional[datetime] = None, until: Optional[datetime] = None) -> Dict[str, int]:
+        """Sum rollup counts grouped by a rollup column"""
+        query = self._apply_rollup_filters(
+            select(column, func.sum(ChatLogRollup.count)), student_id, since, until
+        )
+        async with self.ReadSessionLocal() as db:
+            result = await db.execute(query.group_by(column))
+            return {value: count for value, count in result}
+    
+    async def get_sentiment_stats(self, student_id: Optional[str] = None,
+                                  since: Optional[datetime] = None,
+                                  until: Optional[datetime] = None) -> Dict[str, int]:
+        """Get sentiment statistics"""
+        return await self._count_by(ChatLogRollup.sentiment, student_id, since, until)
+    
+    async def get_persona_usage(self, student_id: Optional[str] = None,
+                                since: Optional[datetime] = None,
+                                until: Optional[datetime] = None) -> Dict[str, int]:
         """Get persona usage statistics"""
-        db = self.SessionLocal()
-        try:
-            query = db.query(ChatLog)
-            if student_id:
-                query = query.filter(ChatLog.student_id == student_id)
-            
-            chats = query.all()
-            stats = {}
-            for chat in chats:
-                persona = chat.persona_used or "unknown"
-                stats[persona] = stats.get(persona, 0) + 1
-            return stats
-        finally:
-            db.close()
+        return await self._count_by(ChatLogRollup.persona, student_id, since, until)
+    
+    async def get_domain_usage(self, student_id: Optional[str] = None,
+                               since: Optional[datetime] = None,
+                               until: Optional[datetime] = None) -> Dict[str, int]:
+        """Get domain usage statistics"""
+        return await self._count_by(ChatLogRollup.domain, student_id, since, until)
+    
+    async def get_intent_usage(self, student_id: Optional[str] = None,
+                               since: Optional[datetime] = None,
+                               until: Optional[datetime] = None) -> Dict[str, int]:
+        """Get intent statistics"""
+        return await self._count_by(ChatLogRollup.intent, student_id, since, until)
+    
+    async def get_activity_timeline(self, bucket: str = "day", student_id: Optional[str] = None,
+                                    since: Optional[datetime] = None,
+                                    until: Optional[datetime] = None) -> List[Dict]:
+        """Get chat counts per time bucket (hour, day, week or month), oldest first"""
+        if bucket not in TIME_BUCKET_FORMATS:
+            raise ValueError(f"Unsupported bucket '{bucket}', use one of: {', '.join(TIME_BUCKET_FORMATS)}")
+        
+        key = func.strftime(TIME_BUCKET_FORMATS[bucket], ChatLogRollup.bucket_hour)
+        query = self._apply_rollup_filters(
+            select(key, func.sum(ChatLogRollup.count)), student_id, since, until
+        )
+        async with self.ReadSessionLocal() as db:
+            result = await db.execute(query.group_by(key).order_by(key))
+            return [{"bucket": value, "count": count} for value, count in result]
     
     def detect_sentiment(self, message: str) -> str:
         """Simple sentiment detection based on keywords"""
@@ -0,0 +1,151 @@
+"""
+Vectorized student-company eligibility matching over a columnar cohort
+"""
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from backend.models.schemas import CompanyCriteria
+from backend.services.student_index import parse_tags
+
+# Set bits per byte value, for popcount on NumPy versions without bitwise_count
+_POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+
+def _popcount(words: np.ndarray) -> np.ndarray:
+    """Number of set bits in each uint64 element"""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words)
+    return _POPCOUNT[words.view(np.uint8)].reshape(-1, 8).sum(axis=1)
+
+
+class CohortMatrix:
+    """
+    Student profiles laid out as NumPy columns
+
+    Every student is one row index across the arrays. Skills are a packed
+    bitset per student (one bit per known skill), stored as one contiguous
+    uint64 column per 64 skills, so required and preferred skill checks
+    are a few bitwise operations on whole columns.
+    """
+
+    def __init__(self, profiles: List[Dict[str, Any]], skills: Iterable[tuple]):
+        """
+        Build the matrix
+
+        Args:
+            profiles: Dicts with student_id, name, department, current_cgpa,
+                arrears_count and year
+            skills: (student_id, normalized skill) pairs
+        """
+        self.size = len(profiles)
+        self.student_ids = np.array([p["student_id"] for p in profiles], dtype=object)
+        self.names = np.array([p["name"] for p in profiles], dtype=object)
+        self.cgpa = np.array(
+            [p["current_cgpa"] if p["current_cgpa"] is not None else np.nan for p in profiles],
+            dtype=np.float32
+        )
+        self.arrears = np.array([p["arrears_count"] or 0 for p in profiles], dtype=np.int32)
+        self.year = np.array([p["year"] or 0 for p in profiles], dtype=np.int16)
+
+        # Departments as integer codes into a vocabulary
+        self.departments: Dict[str, int] = {}
+        self.department = np.array(
+            [self.departments.setdefault(p["department"].strip().lower(), len(self.departments))
+             for p in profiles],
+            dtype=np.int32
+        )
+
+        row_of = {student_id: row for row, student_id in enumerate(self.student_ids)}
+        skills = [(row_of[student_id], skill) for student_id, skill in skills if student_id in row_of]
+        self.skills: Dict[str, int] = {}
+        for _, skill in skills:
+            self.skills.setdefault(skill, len(self.skills))
+
+        self.bitset = np.zeros((max(1, (len(self.skills) + 63) // 64), self.size), dtype=np.uint64)
+        if skills:
+            rows = np.array([row for row, _ in skills], dtype=np.int64)
+            bits = np.array([self.skills[skill] for _, skill in skills], dtype=np.uint64)
+            np.bitwise_or.at(
+                self.bitset, (bits // 64, rows), np.left_shift(np.uint64(1), bits % np.uint64(64))
+            )
+
+    def skill_mask(self, skills: List[str]) -> Optional[Dict[int, np.uint64]]:
+        """
+        Bitset words for a list of skills
+
+        Returns:
+            Non-zero mask words keyed by word index, or None if any skill
+            is unknown to the cohort
+        """
+        mask: Dict[int, int] = {}
+        for skill in parse_tags(",".join(skills)):
+            bit = self.skills.get(skill)
+            if bit is None:
+                return None
+            mask[bit // 64] = mask.get(bit // 64, 0) | (1 << (bit % 64))
+        return {word: np.uint64(value) for word, value in mask.items()}
+
+    def match(self, criteria: CompanyCriteria) -> Dict[str, Any]:
+        """
+        Filter and rank the whole cohort against one company in a single pass
+
+        Eligible students meet the CGPA cutoff, arrears limit, department and
+        year lists and hold every required skill. They are ranked by the
+        number of preferred skills held, then by CGPA.
+
+        Returns:
+            Eligible count and the top criteria.limit students
+        """
+        eligible = np.ones(self.size, dtype=bool)
+        if criteria.min_cgpa is not None:
+            eligible &= self.cgpa >= criteria.min_cgpa  # NaN (no CGPA) never passes
+        if criteria.max_arrears is not None:
+            eligible &= self.arrears <= criteria.max_arrears
+        if criteria.departments:
+            codes = [self.departments[d.strip().lower()] for d in criteria.departments
+                     if d.strip().lower() in self.departments]
+            eligible &= np.isin(self.department, codes)
+        if criteria.years:
+            eligible &= np.isin(self.year, criteria.years)
+
+        required = self.skill_mask(criteria.required_skills)
+        if required is None:
+            eligible[:] = False
+        else:
+            for word, bits in required.items():
+                eligible &= (self.bitset[word] & bits) == bits
+
+        candidates = np.flatnonzero(eligible)
+        preferred_count = np.zeros(len(candidates), dtype=np.int32)
+        if criteria.preferred_skills and len(candidates):
+            # Unknown preferred skills simply match nobody
+            known = [s for s in parse_tags(",".join(criteria.preferred_skills)) if s in self.skills]
+            for word, bits in self.skill_mask(known).items():
+                preferred_count += _popcount(self.bitset[word, candidates] & bits)
+
+        cgpa = np.nan_to_num(self.cgpa[candidates], nan=0.0)
+        # CGPA is at most 10, so each preferred skill outranks any CGPA difference
+        score = preferred_count * 10.0 + cgpa
+        top = min(criteria.limit, len(candidates))
+        if top < len(candidates):
+            best = np.argpartition(-score, top - 1)[:top]
+        else:
+            best = np.arange(len(candidates))
+        best = best[np.lexsort((self.student_ids[candidates[best]].astype(str), -score[best]))]
+
+        return {
+            "company": criteria.company,
+            "eligible": int(len(candidates)),
+            "shortlist": [
+                {
+                    "student_id": self.student_ids[row],
+                    "name": self.names[row],
+                    "cgpa": None if np.isnan(self.cgpa[row]) else round(float(self.cgpa[row]), 2),
+                    "arrears_count": int(self.arrears[row]),
+                    "preferred_skills_matched": int(preferred_count[i]),
+                    "score": round(float(score[i]), 2)
+                }
+                for i, row in ((i, candidates[i]) for i in best)
+            ]
+        }
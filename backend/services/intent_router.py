@@ -2,10 +2,11 @@
 Intent router service for domain classification
 """
 import re
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 import json
 
 from backend.models.schemas import DomainType, IntentClassification
+from backend.services.keyword_matcher import KeywordMatcher
 from backend.services.llm_client import llm_client
 from backend.prompts.system_prompts import INTENT_CLASSIFICATION_PROMPT
 
@@ -71,6 +72,13 @@ class IntentRouter:
                 "problem solving", "critical thinking", "behavioral interview"
             ]
         }
+        
+        # One automaton over every keyword list, matched on whole words
+        self.keyword_matcher = KeywordMatcher({
+            **self.domain_keywords,
+            "strict_recruiter": self.strict_recruiter_keywords,
+            "supportive_mentor": self.supportive_mentor_keywords
+        })
     
     async def classify_intent(self, query: str, use_llm: bool = True) -> IntentClassification:
         """
@@ -83,11 +91,12 @@ class IntentRouter:
         Returns:
             Intent classification result with persona
         """
-        # Try keyword-based classification first
-        keyword_result = self._classify_by_keywords(query)
+        # Try keyword-based classification first (one scan serves domain and persona)
+        matches = self.keyword_matcher.find(query)
+        keyword_result = self._classify_by_keywords(query, matches)
         
         # Detect persona
-        persona = self._detect_persona(query)
+        persona = self._detect_persona(query, matches)
         keyword_result["persona"] = persona
         
         if keyword_result["confidence"] > 0.7 or not use_llm:
@@ -103,31 +112,28 @@ class IntentRouter:
             print(f"LLM classification failed: {e}")
             return IntentClassification(**keyword_result)
     
-    def _classify_by_keywords(self, query: str) -> Dict[str, Any]:
+    def _classify_by_keywords(self, query: str,
+                              matches: Optional[Dict[Any, List[str]]] = None) -> Dict[str, Any]:
         """
         Classify query using keyword matching
         
         Args:
             query: User's query
+            matches: Result of keyword_matcher.find(query), if already computed
         
         Returns:
             Classification result
         """
         query_lower = query.lower()
+        if matches is None:
+            matches = self.keyword_matcher.find(query)
         domain_scores = {}
         
-        for domain, keywords in self.domain_keywords.items():
-            score = 0
-            matched_keywords = []
-            
-            for keyword in keywords:
-                if keyword in query_lower:
-                    score += 1
-                    matched_keywords.append(keyword)
-            
-            if score > 0:
+        for domain in self.domain_keywords:
+            matched_keywords = matches.get(domain)
+            if matched_keywords:
                 domain_scores[domain] = {
-                    "score": score,
+                    "score": len(matched_keywords),
                     "keywords": matched_keywords
                 }
         
@@ -158,15 +164,17 @@ class IntentRouter:
             "entities": {"matched_keywords": keywords}
         }
     
-    def _detect_persona(self, query: str) -> str:
+    def _detect_persona(self, query: str, matches: Optional[Dict[Any, List[str]]] = None) -> str:
         """Detect which persona to use based on query"""
         query_lower = query.lower()
+        if matches is None:
+            matches = self.keyword_matcher.find(query)
         
         # Check for strict recruiter triggers
-        strict_score = sum(1 for keyword in self.strict_recruiter_keywords if keyword in query_lower)
+        strict_score = len(matches.get("strict_recruiter", []))
         
         # Check for supportive mentor triggers
-        supportive_score = sum(1 for keyword in self.supportive_mentor_keywords if keyword in query_lower)
+        supportive_score = len(matches.get("supportive_mentor", []))
         
         # Check for question patterns that indicate technical assessment
         technical_patterns = [r"what is", r"explain", r"how does", r"difference between", 
@@ -0,0 +1,103 @@
+"""
+Aho–Corasick multi-keyword matcher over word tokens
+"""
+import re
+from collections import deque
+from typing import Dict, Hashable, Iterable, List, Tuple
+
+# Words are letters/digits with an optional apostrophe suffix ("don't", "i2c")
+_TOKEN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+# Inflections accepted on a keyword's last token ("model" -> "models", "stress" -> "stressed")
+SUFFIXES = ("s", "es", "ed", "ing")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens of a text (curly apostrophes normalized)"""
+    return _TOKEN.findall(text.lower().replace("’", "'"))
+
+
+class KeywordMatcher:
+    """
+    Finds every keyword of every group in one pass over a text
+
+    Keywords are matched as whole token sequences, so "ai" does not match
+    inside "said" and "arm" does not match "alarm". The last token of a
+    keyword may carry one of SUFFIXES ("model" matches "models"). The
+    automaton runs over tokens: goto transitions are per-state dicts,
+    failure links point to the longest proper suffix state, and each
+    state's output already includes the outputs reachable through its
+    failure chain, so overlapping keywords ("interview" and "mock
+    interview") are all reported.
+    """
+
+    def __init__(self, groups: Dict[Hashable, Iterable[str]]):
+        """
+        Build the automaton
+
+        Args:
+            groups: Keyword lists keyed by group (e.g. domain or persona)
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[Hashable, str]]] = [[]]
+
+        for group, keywords in groups.items():
+            for keyword in keywords:
+                tokens = tokenize(keyword)
+                if not tokens:
+                    continue
+                for suffix in ("",) + SUFFIXES:
+                    self._add(tokens[:-1] + [tokens[-1] + suffix], (group, keyword))
+        self._link()
+
+    def _add(self, tokens: List[str], match: Tuple[Hashable, str]) -> None:
+        state = 0
+        for token in tokens:
+            next_state = self._goto[state].get(token)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][token] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        if match not in self._output[state]:
+            self._output[state].append(match)
+
+    def _link(self) -> None:
+        """Compute failure links breadth-first and merge suffix outputs"""
+        # Depth-1 states fail to the root, which they are initialized to
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(token, 0)
+                self._output[child] += [
+                    match for match in self._output[self._fail[child]] if match not in self._output[child]
+                ]
+
+    def find(self, text: str) -> Dict[Hashable, List[str]]:
+        """
+        Match all keywords in a text
+
+        Returns:
+            Matched keywords per group, each listed once in order of first
+            occurrence; groups without matches are absent
+        """
+        matches: Dict[Hashable, List[str]] = {}
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for token in tokenize(text):
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            for group, keyword in output[state]:
+                found = matches.setdefault(group, [])
+                if keyword not in found:
+                    found.append(keyword)
+        return matches
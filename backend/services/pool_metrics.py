@@ -0,0 +1,95 @@
+"""
+Latency metrics for a database connection pool
+"""
+import time
+from collections import deque
+from typing import Any, Dict, List
+
+from sqlalchemy import event
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _summary(samples: deque) -> Dict[str, float]:
+    """Milliseconds at p50 / p95 / p99 / max of the samples"""
+    if not samples:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    ordered = sorted(samples)
+    return {
+        "p50_ms": round(_percentile(ordered, 0.50) * 1000, 2),
+        "p95_ms": round(_percentile(ordered, 0.95) * 1000, 2),
+        "p99_ms": round(_percentile(ordered, 0.99) * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2)
+    }
+
+
+class PoolMetrics:
+    """
+    Statement latency and connection hold times of one engine's pool
+
+    Hooks SQLAlchemy cursor and pool events on the engine. Statement
+    latency runs from cursor execute to result (including the driver's
+    thread hop for aiosqlite); hold time runs from pool checkout to
+    checkin, i.e. how long a unit of work kept the connection from others.
+    Percentiles cover the most recent `window` samples.
+    """
+
+    def __init__(self, name: str, engine, window: int = 1000):
+        """
+        Attach to an engine
+
+        Args:
+            name: Pool label used in stats
+            engine: Sync engine (AsyncEngine.sync_engine for async engines)
+            window: Samples kept per percentile series
+        """
+        self.name = name
+        self.pool = engine.pool
+        self.statements = 0
+        self.errors = 0
+        self.checkouts = 0
+        self._statement_times: deque = deque(maxlen=window)
+        self._hold_times: deque = deque(maxlen=window)
+
+        event.listen(engine, "before_cursor_execute", self._before_execute)
+        event.listen(engine, "after_cursor_execute", self._after_execute)
+        event.listen(engine, "handle_error", self._on_error)
+        event.listen(engine.pool, "checkout", self._on_checkout)
+        event.listen(engine.pool, "checkin", self._on_checkin)
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self._statement_times.append(time.perf_counter() - conn.info["query_start"].pop())
+        self.statements += 1
+
+    def _on_error(self, exception_context):
+        starts = exception_context.connection.info.get("query_start") if exception_context.connection else None
+        if starts:
+            starts.pop()
+        self.errors += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checked_out_at"] = time.perf_counter()
+        self.checkouts += 1
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        started = connection_record.info.pop("checked_out_at", None)
+        if started is not None:
+            self._hold_times.append(time.perf_counter() - started)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get counters, latency percentiles and current pool occupancy"""
+        return {
+            "pool": self.name,
+            "size": self.pool.size() if hasattr(self.pool, "size") else None,
+            "checked_out": self.pool.checkedout() if hasattr(self.pool, "checkedout") else None,
+            "checkouts": self.checkouts,
+            "statements": self.statements,
+            "errors": self.errors,
+            "statement_latency": _summary(self._statement_times),
+            "connection_hold": _summary(self._hold_times)
+        }
@@ -0,0 +1,87 @@
+"""
+Bounded TTL cache for student profile lookups
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# Returned by get() when a key is not cached, since None is a valid cached value
+MISSING = object()
+
+
+class ProfileCache:
+    """
+    LRU cache with per-entry expiry
+
+    Holds detached StudentProfile objects keyed by student_id, including
+    negative (None) results so unknown IDs on the chat path do not hit
+    the database either. Writers must call invalidate() for every
+    profile they change.
+    """
+
+    def __init__(self, max_entries: int = 5000, ttl_seconds: float = 300):
+        """
+        Initialize cache
+
+        Args:
+            max_entries: Maximum cached profiles before least recently used are evicted
+            ttl_seconds: Entry lifetime; 0 disables caching
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: str) -> Any:
+        """
+        Look up a cached value
+
+        Returns:
+            Cached value (possibly None), or MISSING if absent or expired
+        """
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return MISSING
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: str, value: Any) -> None:
+        """Cache a value, evicting the least recently used entries if full"""
+        if self.ttl <= 0 or self.max_entries <= 0:
+            return
+
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """Drop one entry, or every entry if key is None"""
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+        self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Get size and hit-ratio counters"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "capacity": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations
+        }
@@ -0,0 +1,68 @@
+"""
+Content-addressed, compressed storage of chat bot responses
+"""
+import hashlib
+from typing import Any, Dict, List
+
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from backend.models.database import ChatLog, ResponseBlob, compress_response, decompress_response
+
+
+def response_hash(response: str) -> str:
+    """Content key of a response body"""
+    return hashlib.blake2b(response.encode("utf-8"), digest_size=16).hexdigest()
+
+
+async def store_responses(db, rows: List[Dict[str, Any]]) -> None:
+    """
+    Move the bot_response text of chat_logs row dicts into response_blobs
+
+    Each row gets a response_hash and an empty inline bot_response. Every
+    distinct body is inserted with ON CONFLICT DO NOTHING as the first
+    write of the caller's transaction, before the rows that reference
+    them. Checking for existing blobs first would leave a window in which
+    garbage collection on another connection deletes an unreferenced
+    blob the rows are about to point at; the insert instead takes the
+    write lock, so collection waits until the references are committed.
+
+    Args:
+        db: Async session that will insert or update the rows
+        rows: chat_logs row dicts with bot_response text
+    """
+    bodies: Dict[str, str] = {}
+    for row in rows:
+        key = response_hash(row["bot_response"])
+        bodies.setdefault(key, row["bot_response"])
+        row["response_hash"] = key
+        row["bot_response"] = ""
+
+    blobs = []
+    for key, response in bodies.items():
+        body, compressed = compress_response(response)
+        blobs.append({
+            "hash": key, "body": body, "compressed": compressed,
+            "size": len(response.encode("utf-8")), "refs": 0
+        })
+    if blobs:
+        await db.execute(sqlite_insert(ResponseBlob).on_conflict_do_nothing(index_elements=["hash"]), blobs)
+
+
+def with_response_bodies(query):
+    """Add each row's stored response (hash, body, compressed) to a chat_logs query"""
+    return query.add_columns(
+        ChatLog.response_hash.label("stored_hash"), ResponseBlob.body, ResponseBlob.compressed
+    ).outerjoin(ResponseBlob, ResponseBlob.hash == ChatLog.response_hash)
+
+
+def resolve_response(row) -> Dict[str, Any]:
+    """
+    Turn a with_response_bodies() row mapping into a plain dict with bot_response text
+
+    Rows written before response_blobs existed keep their inline text.
+    """
+    resolved = dict(row)
+    body, compressed = resolved.pop("body"), resolved.pop("compressed")
+    if resolved.pop("stored_hash") is not None and body is not None:
+        resolved["bot_response"] = decompress_response(body, compressed)
+    return resolved
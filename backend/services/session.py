@@ -1,25 +1,44 @@
 """
 Session management service for conversation context
 """
+import asyncio
+import logging
+import time
 import uuid
-from typing import Dict, Optional, List
-from datetime import datetime, timedelta
-import json
+from typing import Dict, Optional, List, Tuple
 
-from backend.models.schemas import SessionContext, ChatMessage, MessageRole
-from backend.config import config
+from backend.models.schemas import SessionContext, MessageRole
+from backend.services.session_store import (
+    SessionStore, CompactMessage, create_session_store, write_snapshot, read_snapshot
+)
+from backend.services.session_journal import SessionJournal, create_session_journal
+
+logger = logging.getLogger(__name__)
 
 
 class SessionManager:
     """Manages user sessions and conversation history"""
     
-    def __init__(self):
-        """Initialize session manager with in-memory storage"""
-        # In production, use Redis or database
-        self._sessions: Dict[str, SessionContext] = {}
-        self._cleanup_interval = timedelta(minutes=config.SESSION_EXPIRE_MINUTES)
+    def __init__(self, store: Optional[SessionStore] = None, journal: Optional[SessionJournal] = None):
+        """
+        Initialize session manager
+        
+        Args:
+            store: Session storage backend (Redis when REDIS_URL is set, otherwise in-memory)
+            journal: Write-ahead journal for in-memory changes (configured default when store is omitted)
+        """
+        if store is None:
+            store = create_session_store()
+            journal = create_session_journal()
+        self._store = store
+        self._journal = journal
+    
+    def _journal_append(self, record: list):
+        """Buffer a change record for the write-ahead journal"""
+        if self._journal:
+            self._journal.append(record)
     
-    def create_session(
+    async def create_session(
         self,
         student_name: Optional[str] = None,
         major: Optional[str] = None,
@@ -43,10 +62,11 @@ class SessionManager:
             major=major,
             year=year
         )
-        self._sessions[session_id] = session
+        await self._store.create(session)
+        self._journal_append(["c", session.model_dump(mode="json", exclude={"conversation_history"})])
         return session_id
     
-    def get_session(self, session_id: str) -> Optional[SessionContext]:
+    async def get_session(self, session_id: str) -> Optional[SessionContext]:
         """
         Get session by ID
         
@@ -56,24 +76,15 @@ class SessionManager:
         Returns:
             Session context or None if expired/not found
         """
-        session = self._sessions.get(session_id)
-        if not session:
-            return None
-        
-        # Check expiration
-        if datetime.now() - session.last_activity > self._cleanup_interval:
-            self.delete_session(session_id)
-            return None
-        
-        return session
+        return await self._store.load(session_id)
     
-    def update_session_activity(self, session_id: str):
+    async def update_session_activity(self, session_id: str):
         """Update last activity timestamp"""
-        session = self._sessions.get(session_id)
+        session = await self._store.load(session_id)
         if session:
-            session.last_activity = datetime.now()
+            await self._store.save(session)
     
-    def add_message(
+    async def add_message(
         self,
         session_id: str,
         role: MessageRole,
@@ -92,24 +103,18 @@ class SessionManager:
         Returns:
             Success status
         """
-        session = self.get_session(session_id)
-        if not session:
+        message = CompactMessage.create(role, content, metadata)
+        if not await self._store.append_message(session_id, message):
             return False
         
-        message = ChatMessage(
-            role=role,
-            content=content,
-            metadata=metadata
-        )
-        session.conversation_history.append(message)
-        self.update_session_activity(session_id)
+        self._journal_append(["m", session_id, message.to_list()])
         return True
     
-    def get_conversation_history(
+    async def get_conversation_history(
         self,
         session_id: str,
         limit: Optional[int] = None
-    ) -> List[ChatMessage]:
+    ) -> List[CompactMessage]:
         """
         Get conversation history
         
@@ -120,18 +125,72 @@ class SessionManager:
         Returns:
             List of chat messages
         """
-        session = self.get_session(session_id)
+        return await self._store.get_history(session_id, limit=limit)
+    
+    async def get_prompt_history(
+        self,
+        session_id: str,
+        limit: Optional[int] = None
+    ) -> Tuple[Optional[str], List[CompactMessage]]:
+        """
+        Get the running summary and the recent messages it does not cover
+        
+        Args:
+            session_id: Session identifier
+            limit: Maximum number of messages to return (most recent)
+        
+        Returns:
+            Tuple of (summary or None, unsummarized messages)
+        """
+        session = await self.get_session(session_id)
         if not session:
-            return []
+            return None, []
         
-        history = session.conversation_history
-        if limit:
-            return history[-limit:]
-        return history
+        history = await self._store.get_history(session_id, limit=limit)
+        if session.summary_until:
+            history = [msg for msg in history if msg.created > session.summary_until]
+        return session.summary, history
     
-    def update_user_context(
+    async def update_summary(self, session_id: str, summary: str, summary_until: float) -> bool:
+        """
+        Store a new running summary
+        
+        Args:
+            session_id: Session identifier
+            summary: Summary of all messages up to summary_until
+            summary_until: Timestamp of the last summarized message
+        
+        Returns:
+            Success status
+        """
+        session = await self.get_session(session_id)
+        if not session:
+            return False
+        
+        session.summary = summary
+        session.summary_until = summary_until
+        await self._store.save(session)
+        self._journal_append([
+            "u", session_id, {"summary": summary, "summary_until": summary_until}, time.time()
+        ])
+        return True
+    
+    async def get_message_count(self, session_id: str) -> int:
+        """
+        Get number of stored messages
+        
+        Args:
+            session_id: Session identifier
+        
+        Returns:
+            Message count
+        """
+        return await self._store.history_length(session_id)
+    
+    async def update_user_context(
         self,
         session_id: str,
+        student_id: Optional[str] = None,
         student_name: Optional[str] = None,
         major: Optional[str] = None,
         year: Optional[int] = None,
@@ -143,6 +202,7 @@ class SessionManager:
         
         Args:
             session_id: Session identifier
+            student_id: Stored student profile ID
             student_name: Student's name
             major: Student's major
             year: Student's year
@@ -152,25 +212,27 @@ class SessionManager:
         Returns:
             Success status
         """
-        session = self.get_session(session_id)
+        session = await self.get_session(session_id)
         if not session:
             return False
         
-        if student_name:
-            session.student_name = student_name
-        if major:
-            session.major = major
-        if year:
-            session.year = year
-        if target_companies:
-            session.target_companies = target_companies
-        if target_roles:
-            session.target_roles = target_roles
-        
-        self.update_session_activity(session_id)
+        updates = {
+            "student_id": student_id,
+            "student_name": student_name,
+            "major": major,
+            "year": year,
+            "target_companies": target_companies,
+            "target_roles": target_roles
+        }
+        updates = {field: value for field, value in updates.items() if value}
+        for field, value in updates.items():
+            setattr(session, field, value)
+        
+        await self._store.save(session)
+        self._journal_append(["u", session_id, updates, time.time()])
         return True
     
-    def get_user_context(self, session_id: str) -> Optional[Dict]:
+    async def get_user_context(self, session_id: str) -> Optional[Dict]:
         """
         Get user context as dictionary
         
@@ -180,11 +242,12 @@ class SessionManager:
         Returns:
             User context dictionary
         """
-        session = self.get_session(session_id)
+        session = await self.get_session(session_id)
         if not session:
             return None
         
         return {
+            "student_id": session.student_id,
             "student_name": session.student_name,
             "major": session.major,
             "year": session.year,
@@ -192,7 +255,7 @@ class SessionManager:
             "target_roles": session.target_roles
         }
     
-    def delete_session(self, session_id: str) -> bool:
+    async def delete_session(self, session_id: str) -> bool:
         """
         Delete a session
         
@@ -202,25 +265,111 @@ class SessionManager:
         Returns:
             Success status
         """
-        if session_id in self._sessions:
-            del self._sessions[session_id]
-            return True
-        return False
+        deleted = await self._store.delete(session_id)
+        if deleted:
+            self._journal_append(["d", session_id])
+        return deleted
     
-    def cleanup_expired_sessions(self):
+    async def cleanup_expired_sessions(self):
         """Remove expired sessions"""
-        current_time = datetime.now()
-        expired_sessions = [
-            sid for sid, session in self._sessions.items()
-            if current_time - session.last_activity > self._cleanup_interval
-        ]
+        return await self._store.cleanup_expired()
+    
+    async def run_cleanup_loop(self, interval_seconds: int):
+        """
+        Periodically remove expired sessions until cancelled
+        
+        Args:
+            interval_seconds: Delay between cleanup passes
+        """
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                removed = await self.cleanup_expired_sessions()
+                if removed:
+                    logger.info(f"Expired {removed} sessions")
+            except Exception as e:
+                logger.error(f"Session cleanup failed: {e}")
+    
+    async def save_snapshot(self, path: str) -> int:
+        """
+        Write all live sessions to a snapshot file
+        
+        Args:
+            path: Snapshot file path
+        
+        Returns:
+            Number of sessions written
+        """
+        if self._store.persistent:
+            return 0
+        
+        # Seal the journal and copy on the event loop with no await in between,
+        # so the snapshot covers exactly the sealed segments
+        journal_seq = self._journal.rotate() if self._journal else 0
+        records = self._store.export_records()
+        await asyncio.to_thread(write_snapshot, path, records, journal_seq)
+        
+        if self._journal:
+            self._journal.compact(journal_seq)
+        return len(records)
+    
+    async def load_snapshot(self, path: str) -> int:
+        """
+        Restore sessions from a snapshot file and replay newer journal records
+        
+        Args:
+            path: Snapshot file path
         
-        for sid in expired_sessions:
-            self.delete_session(sid)
+        Returns:
+            Number of sessions restored from the snapshot
+        """
+        if self._store.persistent:
+            return 0
         
-        return len(expired_sessions)
+        records, journal_seq = await asyncio.to_thread(read_snapshot, path)
+        restored = self._store.import_records(records)
+        
+        if self._journal:
+            replayed = 0
+            for record in self._journal.replay(after_seq=journal_seq):
+                self._store.apply_journal_record(record)
+                replayed += 1
+            if replayed:
+                logger.info(f"Replayed {replayed} session journal records")
+            self._journal.open()
+        return restored
+    
+    async def run_journal_commit_loop(self):
+        """Group-commit journal records until cancelled"""
+        if self._journal:
+            await self._journal.run_commit_loop()
+    
+    async def run_snapshot_loop(self, path: str, interval_seconds: int):
+        """
+        Periodically snapshot live sessions until cancelled
+        
+        Args:
+            path: Snapshot file path
+            interval_seconds: Delay between snapshots
+        """
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await self.save_snapshot(path)
+            except Exception as e:
+                logger.error(f"Session snapshot failed: {e}")
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Get session storage counters"""
+        return self._store.stats()
+    
+    async def close(self):
+        """Close the session journal and storage backend"""
+        if self._journal:
+            self._journal.close()
+        await self._store.close()
     
-    def export_session(self, session_id: str) -> Optional[str]:
+    async def export_session(self, session_id: str) -> Optional[str]:
         """
         Export session as JSON string
         
@@ -230,11 +379,12 @@ class SessionManager:
         Returns:
             JSON string of session data
         """
-        session = self.get_session(session_id)
+        session = await self.get_session(session_id)
         if not session:
             return None
         
-        return session.model_dump_json(indent=2)
+        history = [msg.to_chat_message() for msg in await self._store.get_history(session_id)]
+        return session.model_copy(update={"conversation_history": history}).model_dump_json(indent=2)
 
 
 # Singleton instance
@@ -0,0 +1,192 @@
+"""
+Append-only write-ahead journal for in-memory session changes
+"""
+import asyncio
+import json
+import logging
+import os
+import re
+from typing import Iterator, List, Optional, Tuple
+
+from backend.config import config
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_PATTERN = re.compile(r"^journal-(\d{8})\.log$")
+
+
+class SessionJournal:
+    """
+    Segmented append-only journal with group commit
+
+    Records are compact JSON lines. append() only writes to a buffered
+    file; a single commit loop flushes and fsyncs every flush_interval_ms
+    or as soon as flush_records records are pending. Segments rotate by
+    size and are removed once a snapshot covers them.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        flush_interval_ms: int = 50,
+        flush_records: int = 256,
+        segment_max_bytes: int = 16 * 1024 * 1024
+    ):
+        """
+        Initialize journal
+
+        Args:
+            directory: Directory holding journal segments
+            flush_interval_ms: Maximum delay before pending records are fsynced
+            flush_records: Pending record count that triggers an early commit
+            segment_max_bytes: Segment size that triggers rotation
+        """
+        self.directory = directory
+        self.flush_interval = flush_interval_ms / 1000
+        self.flush_records = flush_records
+        self.segment_max_bytes = segment_max_bytes
+        self._file = None
+        self._seq = 0
+        self._pending = 0
+        self._flush_needed = asyncio.Event()
+        self.appends = 0
+        self.commits = 0
+
+    def _segment_path(self, seq: int) -> str:
+        return os.path.join(self.directory, f"journal-{seq:08d}.log")
+
+    def segments(self) -> List[Tuple[int, str]]:
+        """List (sequence, path) of existing segments in order"""
+        if not os.path.isdir(self.directory):
+            return []
+
+        found = []
+        for name in os.listdir(self.directory):
+            match = SEGMENT_PATTERN.match(name)
+            if match:
+                found.append((int(match.group(1)), os.path.join(self.directory, name)))
+        return sorted(found)
+
+    def open(self) -> None:
+        """Start a fresh segment after any existing ones"""
+        os.makedirs(self.directory, exist_ok=True)
+        existing = self.segments()
+        self._seq = existing[-1][0] + 1 if existing else 1
+        self._file = open(self._segment_path(self._seq), "a", encoding="utf-8")
+
+    def append(self, record: list) -> None:
+        """Buffer one record; durability follows at the next group commit"""
+        if not self._file:
+            return
+
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._pending += 1
+        self.appends += 1
+
+        if self._pending >= self.flush_records:
+            self._flush_needed.set()
+        if self._file.tell() >= self.segment_max_bytes:
+            self.rotate()
+
+    async def commit(self) -> None:
+        """Flush buffered records and fsync them off the event loop"""
+        if not self._file or not self._pending:
+            return
+
+        self._file.flush()
+        self._pending = 0
+        # fsync a duplicate descriptor so a concurrent rotation cannot close it
+        fd = os.dup(self._file.fileno())
+        try:
+            await asyncio.to_thread(os.fsync, fd)
+        finally:
+            os.close(fd)
+        self.commits += 1
+
+    async def run_commit_loop(self) -> None:
+        """Group-commit pending records until cancelled"""
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_needed.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_needed.clear()
+
+            try:
+                await self.commit()
+            except Exception as e:
+                logger.error(f"Session journal commit failed: {e}")
+
+    def _sync_close(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._pending = 0
+
+    def rotate(self) -> int:
+        """
+        Seal the current segment and start the next one
+
+        Returns:
+            Sequence number of the sealed segment
+        """
+        if not self._file:
+            return 0
+
+        sealed = self._seq
+        self._sync_close()
+        self._seq += 1
+        self._file = open(self._segment_path(self._seq), "a", encoding="utf-8")
+        return sealed
+
+    def compact(self, up_to_seq: int) -> int:
+        """
+        Remove segments already covered by a snapshot
+
+        Args:
+            up_to_seq: Highest segment sequence included in the snapshot
+
+        Returns:
+            Number of segments removed
+        """
+        removed = 0
+        for seq, path in self.segments():
+            if seq <= up_to_seq and seq != self._seq:
+                os.remove(path)
+                removed += 1
+        return removed
+
+    def replay(self, after_seq: int = 0) -> Iterator[list]:
+        """
+        Yield journaled records from segments newer than after_seq
+
+        A torn final line from a crash mid-write is skipped.
+        """
+        for seq, path in self.segments():
+            if seq <= after_seq:
+                continue
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        logger.warning(f"Skipping torn journal record in {path}")
+
+    def close(self) -> None:
+        """Commit outstanding records and close the active segment"""
+        if self._file:
+            self._sync_close()
+            self._file = None
+
+
+def create_session_journal() -> Optional[SessionJournal]:
+    """Create the journal for the in-memory store, or None if disabled"""
+    if config.REDIS_URL or not config.SESSION_JOURNAL_DIR:
+        return None
+
+    return SessionJournal(
+        config.SESSION_JOURNAL_DIR,
+        flush_interval_ms=config.SESSION_JOURNAL_FLUSH_MS,
+        flush_records=config.SESSION_JOURNAL_FLUSH_RECORDS,
+        segment_max_bytes=config.SESSION_JOURNAL_SEGMENT_BYTES
+    )
@@ -0,0 +1,746 @@
+"""
+Session storage backends for conversation context
+"""
+import asyncio
+import heapq
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Container, Deque, Dict, List, Optional, Tuple
+
+from backend.models.schemas import SessionContext, ChatMessage, MessageRole
+from backend.config import config
+
+
+# Context fields persisted alongside the session (history is stored separately)
+CONTEXT_FIELDS = [
+    "student_id", "student_name", "major", "year", "target_companies", "target_roles",
+    "summary", "summary_until"
+]
+
+# Interned role codes for compact message storage
+ROLES = tuple(MessageRole)
+ROLE_CODES = {role: code for code, role in enumerate(ROLES)}
+
+
+class CompactMessage:
+    """
+    Slotted history entry with an interned role code and epoch timestamp
+
+    Exposes the same role/content/timestamp/metadata attributes as
+    ChatMessage; the pydantic model is only built by to_chat_message().
+    """
+
+    __slots__ = ("role_code", "content", "created", "metadata")
+
+    def __init__(self, role_code: int, content: str, created: float, metadata: Optional[dict] = None):
+        self.role_code = role_code
+        self.content = content
+        self.created = created
+        self.metadata = metadata
+
+    @classmethod
+    def create(cls, role: MessageRole, content: str, metadata: Optional[dict] = None) -> "CompactMessage":
+        """Create a message stamped with the current time"""
+        return cls(ROLE_CODES[MessageRole(role)], content, time.time(), metadata or None)
+
+    @property
+    def role(self) -> MessageRole:
+        return ROLES[self.role_code]
+
+    @property
+    def timestamp(self) -> datetime:
+        return datetime.fromtimestamp(self.created)
+
+    def to_chat_message(self) -> ChatMessage:
+        """Materialize the API model"""
+        return ChatMessage(
+            role=self.role,
+            content=self.content,
+            timestamp=self.timestamp,
+            metadata=self.metadata
+        )
+
+    def to_list(self) -> list:
+        """Positional form matching the constructor arguments"""
+        return [self.role_code, self.content, self.created, self.metadata]
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_list())
+
+    @classmethod
+    def from_json(cls, data: str) -> "CompactMessage":
+        return cls(*json.loads(data))
+
+
+class SessionStore(ABC):
+    """Interface shared by all session storage backends"""
+
+    # Whether the backend survives restarts on its own (no snapshot/journal needed)
+    persistent = False
+
+    def __init__(self, ttl_seconds: int, history_limit: int):
+        """
+        Initialize session store
+
+        Args:
+            ttl_seconds: Idle time after which a session expires
+            history_limit: Maximum number of messages kept per session
+        """
+        self.ttl_seconds = ttl_seconds
+        self.history_limit = history_limit
+
+    @abstractmethod
+    async def create(self, session: SessionContext) -> None:
+        """Persist a newly created session"""
+
+    @abstractmethod
+    async def load(self, session_id: str) -> Optional[SessionContext]:
+        """Load session context (without history), or None if expired/not found"""
+
+    @abstractmethod
+    async def save(self, session: SessionContext) -> None:
+        """Persist session context fields and refresh its expiry"""
+
+    @abstractmethod
+    async def append_message(self, session_id: str, message: CompactMessage) -> bool:
+        """Append a message to the session history and refresh its expiry"""
+
+    @abstractmethod
+    async def get_history(self, session_id: str, limit: Optional[int] = None) -> List[CompactMessage]:
+        """Get the most recent messages of a session, oldest first"""
+
+    @abstractmethod
+    async def history_length(self, session_id: str) -> int:
+        """Get the number of stored messages for a session"""
+
+    @abstractmethod
+    async def delete(self, session_id: str) -> bool:
+        """Delete a session and its history"""
+
+    @abstractmethod
+    async def cleanup_expired(self) -> int:
+        """Remove expired sessions, returning how many were removed"""
+
+    def stats(self) -> Dict[str, int]:
+        """Get backend counters"""
+        return {}
+
+    def export_records(self) -> List[tuple]:
+        """Copy live sessions as (context dict, history lists) records for snapshotting"""
+        return []
+
+    def import_records(self, records: List[tuple]) -> int:
+        """Restore sessions from snapshot records, returning how many were loaded"""
+        return 0
+
+    def apply_journal_record(self, record: list) -> None:
+        """Re-apply one journaled change during startup replay"""
+
+    async def close(self) -> None:
+        """Release backend resources"""
+
+
+class SQLiteSessionSpill:
+    """Local SQLite table holding sessions evicted from memory"""
+
+    def __init__(self, db_path: str):
+        """
+        Open (or create) the spill database
+
+        Args:
+            db_path: SQLite file path
+        """
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Spills are written from a worker thread; the lock keeps each
+        # statement and its commit from interleaving with event loop calls
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS spilled_sessions ("
+            "session_id TEXT PRIMARY KEY, last_activity REAL NOT NULL, "
+            "context TEXT NOT NULL, history TEXT NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_spilled_sessions_last_activity "
+            "ON spilled_sessions (last_activity)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def to_row(session: SessionContext, history: Deque[CompactMessage]) -> tuple:
+        """Serialize a session and its history to a spilled_sessions row"""
+        return (
+            session.session_id,
+            session.last_activity.timestamp(),
+            session.model_dump_json(exclude={"conversation_history"}),
+            json.dumps([msg.to_list() for msg in history])
+        )
+
+    @staticmethod
+    def from_row(context: str, history: str) -> Tuple[SessionContext, List[CompactMessage]]:
+        """Deserialize the context and history columns of a spilled_sessions row"""
+        return (
+            SessionContext.model_validate_json(context),
+            [CompactMessage(*item) for item in json.loads(history)]
+        )
+
+    def put(self, session: SessionContext, history: Deque[CompactMessage]) -> None:
+        """Write a session and its history"""
+        self.apply([self.to_row(session, history)], [])
+
+    def get(self, session_id: str) -> Optional[Tuple[SessionContext, List[CompactMessage]]]:
+        """
+        Return a spilled session, or None if not spilled
+
+        The row is kept after rehydration: it stays the durable base that
+        journal records are replayed onto until the session is snapshotted.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT context, history FROM spilled_sessions WHERE session_id = ?",
+                (session_id,)
+            ).fetchone()
+        if not row:
+            return None
+        return self.from_row(*row)
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM spilled_sessions WHERE session_id = ?", (session_id,))
+            self._conn.commit()
+        return cursor.rowcount > 0
+
+    def exists(self, session_id: str) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM spilled_sessions WHERE session_id = ?", (session_id,)
+            ).fetchone() is not None
+
+    def apply(self, rows: List[tuple], deleted: List[str]) -> None:
+        """Write and delete sessions in one transaction (safe to call from a worker thread)"""
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO spilled_sessions VALUES (?, ?, ?, ?)", rows)
+            self._conn.executemany(
+                "DELETE FROM spilled_sessions WHERE session_id = ?", [(sid,) for sid in deleted]
+            )
+            self._conn.commit()
+
+    def delete_older_than(self, cutoff: float, keep: Container[str] = ()) -> int:
+        """
+        Delete spilled sessions idle since before the cutoff timestamp
+
+        Args:
+            cutoff: Epoch timestamp of the oldest activity to keep
+            keep: Session IDs whose rows must survive (currently resident)
+
+        Returns:
+            Number of rows deleted
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT session_id FROM spilled_sessions WHERE last_activity < ?", (cutoff,)
+            ).fetchall()
+            expired = [row for row in rows if row[0] not in keep]
+            self._conn.executemany("DELETE FROM spilled_sessions WHERE session_id = ?", expired)
+            self._conn.commit()
+        return len(expired)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class InMemorySessionStore(SessionStore):
+    """
+    Per-process session store, used for local development and tests
+
+    History is a ring buffer of history_limit messages; older turns are
+    dropped from memory but remain in the chat_logs table. When
+    max_resident is set, least recently used sessions beyond it are
+    spilled to SQLite and rehydrated transparently on next access.
+
+    The store is only touched from the event loop, so its maps need no
+    locks (benchmarks/session_store_concurrency.py). Spill writes and
+    deletes are queued and applied in batches on a worker thread, and
+    spill lookups run in a worker thread too. Until a batch commits, the
+    queued copy is what load() rehydrates and snapshots export.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: int,
+        history_limit: int,
+        max_resident: int = 0,
+        spill: Optional[SQLiteSessionSpill] = None
+    ):
+        """
+        Initialize in-memory storage
+
+        Args:
+            ttl_seconds: Idle time after which a session expires
+            history_limit: Maximum number of messages kept per session
+            max_resident: Maximum sessions held in memory (0 for unlimited)
+            spill: Storage for evicted sessions (evicted sessions are dropped without one)
+        """
+        super().__init__(ttl_seconds, history_limit)
+        # Ordered by recency of use, least recent first
+        self._sessions: "OrderedDict[str, SessionContext]" = OrderedDict()
+        self._histories: Dict[str, Deque[CompactMessage]] = {}
+        self._ttl = timedelta(seconds=ttl_seconds)
+        self._max_resident = max_resident
+        self._spill = spill
+        # Min-heap of (last_activity timestamp, session_id); entries go stale when
+        # a session is touched and are re-queued lazily while draining.
+        # _queued maps each session to the timestamp of its live heap entry.
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._queued: Dict[str, float] = {}
+        # Evicted sessions whose spill has not committed yet, as spilled_sessions rows,
+        # and sessions whose spilled row is still to be deleted; a session is in at
+        # most one of the two
+        self._unspilled: Dict[str, tuple] = {}
+        self._spill_deletes: set = set()
+        self._spill_task: Optional[asyncio.Task] = None
+        self.evictions = 0
+        self.rehydrations = 0
+        self.spill_batches = 0
+
+    def _is_expired(self, session: SessionContext, now: datetime) -> bool:
+        return now - session.last_activity > self._ttl
+
+    def _enqueue_expiry(self, session: SessionContext) -> None:
+        timestamp = session.last_activity.timestamp()
+        self._queued[session.session_id] = timestamp
+        heapq.heappush(self._expiry_heap, (timestamp, session.session_id))
+
+    def _admit(self, session: SessionContext, history: Deque[CompactMessage]) -> None:
+        """Make a session resident, evicting least recently used ones beyond the limit"""
+        self._sessions[session.session_id] = session
+        self._histories[session.session_id] = history
+        self._enqueue_expiry(session)
+
+        while self._max_resident and len(self._sessions) > self._max_resident:
+            sid, evicted = self._sessions.popitem(last=False)
+            evicted_history = self._histories.pop(sid)
+            self._queued.pop(sid, None)
+            if self._spill:
+                self._spill_deletes.discard(sid)
+                self._unspilled[sid] = self._spill.to_row(evicted, evicted_history)
+            self.evictions += 1
+
+        if self._unspilled:
+            self._schedule_spill()
+
+    def _schedule_spill(self) -> None:
+        if self._spill_task and not self._spill_task.done():
+            return  # The running flush picks up new work before it exits
+        try:
+            self._spill_task = asyncio.get_running_loop().create_task(self._flush_spills())
+        except RuntimeError:
+            # Called outside the event loop (scripts, shutdown): write inline
+            self._spill.apply(list(self._unspilled.values()), list(self._spill_deletes))
+            self._unspilled.clear()
+            self._spill_deletes.clear()
+
+    async def _flush_spills(self) -> None:
+        """Apply queued spill writes and deletes off the event loop, one transaction per batch"""
+        while self._unspilled or self._spill_deletes:
+            # Writes stay queued (and visible to load) until committed; a delete
+            # queued meanwhile for one of them lands in the next batch, after it
+            batch = dict(self._unspilled)
+            deleted, self._spill_deletes = list(self._spill_deletes), set()
+            await asyncio.to_thread(self._spill.apply, list(batch.values()), deleted)
+            self.spill_batches += 1
+
+            for sid, row in batch.items():
+                # Re-evicted sessions have a newer row queued for the next batch
+                if self._unspilled.get(sid) is row:
+                    del self._unspilled[sid]
+
+    def _unspill(self, session_id: str) -> None:
+        """Queue removal of a session's spilled copy"""
+        if not self._spill:
+            return
+        self._unspilled.pop(session_id, None)
+        self._spill_deletes.add(session_id)
+        self._schedule_spill()
+
+    def _admit_spilled(self, spilled: Tuple[SessionContext, List[CompactMessage]]) -> SessionContext:
+        session, history = spilled
+        self._admit(session, deque(history, maxlen=self.history_limit))
+        self.rehydrations += 1
+        return session
+
+    async def _rehydrate(self, session_id: str) -> Optional[SessionContext]:
+        if not self._spill or session_id in self._spill_deletes:
+            return None
+
+        row = self._unspilled.pop(session_id, None)
+        if row:
+            return self._admit_spilled(self._spill.from_row(*row[2:]))
+
+        spilled = await asyncio.to_thread(self._spill.get, session_id)
+        # Another request may have loaded, recreated or deleted it meanwhile
+        if session_id in self._sessions:
+            return self._sessions[session_id]
+        if not spilled or session_id in self._spill_deletes or session_id in self._unspilled:
+            return None
+        return self._admit_spilled(spilled)
+
+    def _rehydrate_now(self, session_id: str) -> Optional[SessionContext]:
+        """Blocking _rehydrate for journal replay, which runs at startup before requests are served"""
+        if not self._spill or session_id in self._spill_deletes:
+            return None
+        row = self._unspilled.pop(session_id, None)
+        spilled = self._spill.from_row(*row[2:]) if row else self._spill.get(session_id)
+        return self._admit_spilled(spilled) if spilled else None
+
+    async def create(self, session: SessionContext) -> None:
+        self._admit(session, deque(maxlen=self.history_limit))
+
+    async def load(self, session_id: str) -> Optional[SessionContext]:
+        session = self._sessions.get(session_id)
+        if session:
+            self._sessions.move_to_end(session_id)
+        else:
+            session = await self._rehydrate(session_id)
+            if not session:
+                return None
+
+        # Lazy expiration check
+        if self._is_expired(session, datetime.now()):
+            self._remove(session_id)
+            return None
+
+        return session
+
+    async def save(self, session: SessionContext) -> None:
+        session.last_activity = datetime.now()
+        if session.session_id in self._sessions:
+            self._sessions[session.session_id] = session
+            self._sessions.move_to_end(session.session_id)
+        else:
+            self._admit(session, deque(maxlen=self.history_limit))
+
+    async def append_message(self, session_id: str, message: CompactMessage) -> bool:
+        session = await self.load(session_id)
+        if not session:
+            return False
+
+        self._histories[session_id].append(message)
+        session.last_activity = datetime.now()
+        return True
+
+    async def get_history(self, session_id: str, limit: Optional[int] = None) -> List[CompactMessage]:
+        if not await self.load(session_id):
+            return []
+
+        history = self._histories[session_id]
+        if limit:
+            return list(islice(history, max(len(history) - limit, 0), None))
+        return list(history)
+
+    async def history_length(self, session_id: str) -> int:
+        if not await self.load(session_id):
+            return 0
+        return len(self._histories[session_id])
+
+    def _remove(self, session_id: str) -> bool:
+        self._histories.pop(session_id, None)
+        self._queued.pop(session_id, None)
+        removed = self._sessions.pop(session_id, None) is not None
+        if session_id in self._unspilled:
+            removed = True
+        self._unspill(session_id)
+        return removed
+
+    async def delete(self, session_id: str) -> bool:
+        # Only a session known nowhere in memory needs a spill lookup to report its removal
+        spilled = False
+        if self._spill and not (
+            session_id in self._sessions or session_id in self._unspilled or session_id in self._spill_deletes
+        ):
+            spilled = await asyncio.to_thread(self._spill.exists, session_id)
+        return self._remove(session_id) or spilled
+
+    async def cleanup_expired(self) -> int:
+        """Drain the expiry heap; cost is proportional to expired (or re-queued) entries"""
+        cutoff = (datetime.now() - self._ttl).timestamp()
+        heap = self._expiry_heap
+        removed = 0
+
+        while heap and heap[0][0] < cutoff:
+            queued_at, sid = heapq.heappop(heap)
+            if self._queued.get(sid) != queued_at:
+                continue  # Deleted, evicted or superseded by a newer entry
+
+            session = self._sessions[sid]
+            last_activity = session.last_activity.timestamp()
+            if last_activity < cutoff:
+                self._remove(sid)
+                removed += 1
+            else:
+                # Touched since this entry was queued
+                self._enqueue_expiry(session)
+
+        if self._spill:
+            removed += await asyncio.to_thread(
+                self._spill.delete_older_than, cutoff, set(self._sessions) | set(self._unspilled)
+            )
+
+        return removed
+
+    def export_records(self) -> List[tuple]:
+        # Spilled sessions already live on disk and survive restarts;
+        # queued spills are not on disk yet
+        return [
+            (
+                session.model_dump(exclude={"conversation_history"}),
+                [msg.to_list() for msg in self._histories[sid]]
+            )
+            for sid, session in self._sessions.items()
+        ] + [(json.loads(row[2]), json.loads(row[3])) for row in self._unspilled.values()]
+
+    def import_records(self, records: List[tuple]) -> int:
+        now = datetime.now()
+        loaded = 0
+        for context, history in records:
+            session = SessionContext(**context)
+            if session.session_id in self._sessions or self._is_expired(session, now):
+                continue
+            self._admit(session, deque((CompactMessage(*item) for item in history), maxlen=self.history_limit))
+            loaded += 1
+        return loaded
+
+    def apply_journal_record(self, record: list) -> None:
+        # Replay must be idempotent: a spilled copy may already include
+        # changes that are journaled after the snapshot
+        op = record[0]
+        session_id = record[1]["session_id"] if op == "c" else record[1]
+        if op == "d":
+            self._remove(session_id)
+            return
+
+        session = self._sessions.get(session_id) or self._rehydrate_now(session_id)
+        if op == "c":
+            if not session:
+                self._admit(SessionContext(**record[1]), deque(maxlen=self.history_limit))
+        elif not session:
+            return
+        elif op == "m":
+            message = CompactMessage(*record[2])
+            history = self._histories[session_id]
+            if history and history[-1].created >= message.created:
+                return
+            history.append(message)
+            session.last_activity = max(session.last_activity, message.timestamp)
+        elif op == "u":
+            for field, value in record[2].items():
+                setattr(session, field, value)
+            session.last_activity = max(session.last_activity, datetime.fromtimestamp(record[3]))
+
+    def stats(self) -> Dict[str, int]:
+        """Get residency and eviction counters"""
+        return {
+            "resident_sessions": len(self._sessions),
+            "evictions": self.evictions,
+            "rehydrations": self.rehydrations,
+            "pending_spills": len(self._unspilled),
+            "spill_batches": self.spill_batches
+        }
+
+    async def close(self) -> None:
+        if self._spill:
+            if self._spill_task:
+                await self._spill_task
+            if self._unspilled or self._spill_deletes:
+                self._spill.apply(list(self._unspilled.values()), list(self._spill_deletes))
+            self._spill.close()
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Redis-backed session store shared by all workers
+
+    Layout per session:
+        session:{id}          hash with context fields and timestamps
+        session:{id}:history  list of compact JSON messages, capped with LTRIM
+    Both keys carry the session TTL, so Redis handles expiry natively.
+    """
+
+    persistent = True
+
+    def __init__(self, redis_url: str, ttl_seconds: int, history_limit: int, key_prefix: str = "session"):
+        """
+        Initialize Redis connection
+
+        Args:
+            redis_url: Redis connection URL
+            ttl_seconds: Idle time after which a session expires
+            history_limit: Maximum number of messages kept per session
+            key_prefix: Prefix for all session keys
+        """
+        super().__init__(ttl_seconds, history_limit)
+        import redis.asyncio as aioredis
+
+        self._redis = aioredis.from_url(redis_url, decode_responses=True)
+        self._prefix = key_prefix
+
+    def _context_key(self, session_id: str) -> str:
+        return f"{self._prefix}:{session_id}"
+
+    def _history_key(self, session_id: str) -> str:
+        return f"{self._prefix}:{session_id}:history"
+
+    @staticmethod
+    def _to_hash(session: SessionContext) -> Dict[str, str]:
+        """Serialize context fields to a flat Redis hash"""
+        data = {
+            "session_id": session.session_id,
+            "created_at": session.created_at.isoformat(),
+            "last_activity": session.last_activity.isoformat()
+        }
+        for field in CONTEXT_FIELDS:
+            value = getattr(session, field)
+            if value is not None:
+                data[field] = json.dumps(value)
+        return data
+
+    @staticmethod
+    def _from_hash(data: Dict[str, str]) -> SessionContext:
+        """Deserialize a Redis hash into a session context"""
+        fields = {
+            "session_id": data["session_id"],
+            "created_at": datetime.fromisoformat(data["created_at"]),
+            "last_activity": datetime.fromisoformat(data["last_activity"])
+        }
+        for field in CONTEXT_FIELDS:
+            if field in data:
+                fields[field] = json.loads(data[field])
+        return SessionContext(**fields)
+
+    async def _write_context(self, session: SessionContext) -> None:
+        key = self._context_key(session.session_id)
+        missing = [field for field in CONTEXT_FIELDS if getattr(session, field) is None]
+
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping=self._to_hash(session))
+            if missing:
+                pipe.hdel(key, *missing)
+            pipe.expire(key, self.ttl_seconds)
+            pipe.expire(self._history_key(session.session_id), self.ttl_seconds)
+            await pipe.execute()
+
+    async def create(self, session: SessionContext) -> None:
+        await self._write_context(session)
+
+    async def load(self, session_id: str) -> Optional[SessionContext]:
+        data = await self._redis.hgetall(self._context_key(session_id))
+        if not data:
+            return None
+        return self._from_hash(data)
+
+    async def save(self, session: SessionContext) -> None:
+        session.last_activity = datetime.now()
+        await self._write_context(session)
+
+    async def append_message(self, session_id: str, message: CompactMessage) -> bool:
+        context_key = self._context_key(session_id)
+        history_key = self._history_key(session_id)
+        if not await self._redis.exists(context_key):
+            return False
+
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.rpush(history_key, message.to_json())
+            pipe.ltrim(history_key, -self.history_limit, -1)
+            pipe.hset(context_key, "last_activity", datetime.now().isoformat())
+            pipe.expire(context_key, self.ttl_seconds)
+            pipe.expire(history_key, self.ttl_seconds)
+            await pipe.execute()
+        return True
+
+    async def get_history(self, session_id: str, limit: Optional[int] = None) -> List[CompactMessage]:
+        start = -limit if limit else 0
+        raw = await self._redis.lrange(self._history_key(session_id), start, -1)
+        return [CompactMessage.from_json(item) for item in raw]
+
+    async def history_length(self, session_id: str) -> int:
+        return await self._redis.llen(self._history_key(session_id))
+
+    async def delete(self, session_id: str) -> bool:
+        removed = await self._redis.delete(self._context_key(session_id), self._history_key(session_id))
+        return removed > 0
+
+    async def cleanup_expired(self) -> int:
+        # Redis expires keys natively
+        return 0
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+SNAPSHOT_VERSION = 2
+
+
+def write_snapshot(path: str, records: List[tuple], journal_seq: int = 0) -> None:
+    """
+    Atomically write session records to a binary snapshot file
+
+    The data is written to a temporary file, fsynced and renamed over the
+    previous snapshot, so a crash never leaves a partial snapshot behind.
+    journal_seq is the last journal segment the snapshot covers.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+
+    with open(tmp_path, "wb") as f:
+        pickle.dump((SNAPSHOT_VERSION, time.time(), journal_seq, records), f, protocol=pickle.HIGHEST_PROTOCOL)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+    # Persist the rename itself
+    if hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(directory, os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def read_snapshot(path: str) -> Tuple[List[tuple], int]:
+    """Read (session records, covered journal segment) from a snapshot file"""
+    if not os.path.exists(path):
+        return [], 0
+
+    with open(path, "rb") as f:
+        data = pickle.load(f)
+    if data[0] == 1:
+        return data[2], 0
+    if data[0] != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported session snapshot version: {data[0]}")
+    return data[3], data[2]
+
+
+def create_session_store() -> SessionStore:
+    """Create the session store selected by configuration"""
+    ttl_seconds = config.SESSION_EXPIRE_MINUTES * 60
+    history_limit = config.SESSION_HISTORY_LIMIT
+
+    if config.REDIS_URL:
+        return RedisSessionStore(config.REDIS_URL, ttl_seconds, history_limit)
+
+    spill = None
+    if config.SESSION_MAX_RESIDENT and config.SESSION_SPILL_PATH:
+        spill = SQLiteSessionSpill(config.SESSION_SPILL_PATH)
+    return InMemorySessionStore(ttl_seconds, history_limit, config.SESSION_MAX_RESIDENT, spill)
@@ -0,0 +1,185 @@
+"""
+Incremental CSV / JSONL parsing and validation for bulk student imports
+"""
+import csv
+import json
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+IMPORT_FORMATS = ("csv", "jsonl")
+
+# Accepted input field -> StudentProfile column
+FIELD_COLUMNS = {
+    "student_id": "student_id",
+    "name": "name",
+    "department": "department",
+    "cgpa": "current_cgpa",
+    "current_cgpa": "current_cgpa",
+    "skills": "skills",
+    "arrears_count": "arrears_count",
+    "year": "year",
+    "target_companies": "target_companies"
+}
+
+REQUIRED_FIELDS = ("student_id", "name", "department")
+
+# Text columns; skills and target_companies also accept a list of strings
+TEXT_COLUMNS = ("student_id", "name", "department", "skills", "target_companies")
+LIST_COLUMNS = ("skills", "target_companies")
+
+
+def detect_format(content_type: Optional[str], requested: Optional[str] = None) -> str:
+    """
+    Pick the import format from an explicit request or the Content-Type header
+
+    Raises:
+        ValueError: If the requested format is not supported
+    """
+    if requested:
+        requested = requested.lower()
+        if requested not in IMPORT_FORMATS:
+            raise ValueError(f"Unsupported format '{requested}', use one of: {', '.join(IMPORT_FORMATS)}")
+        return requested
+    return "csv" if content_type and "csv" in content_type.lower() else "jsonl"
+
+
+def _decode_line(line: bytes) -> Tuple[str, Optional[ValueError]]:
+    try:
+        return line.decode("utf-8-sig").rstrip("\r"), None
+    except UnicodeDecodeError as e:
+        # Replacement keeps quotes intact (UTF-8 never encodes '"' inside a
+        # multi-byte sequence), so CSV records still frame correctly
+        text = line.decode("utf-8-sig", errors="replace").rstrip("\r")
+        return text, ValueError(f"Invalid UTF-8 at byte {e.start}")
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[str, Optional[ValueError]]]:
+    """
+    Split a byte stream into decoded lines without buffering the whole body
+
+    Yields (text, error) pairs; for a line that is not valid UTF-8 the
+    error is set and the text has replacement characters.
+    """
+    pending = b""
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield _decode_line(line)
+    if pending:
+        yield _decode_line(pending)
+
+
+async def iter_records(chunks: AsyncIterator[bytes], fmt: str) -> AsyncIterator[Tuple[int, Any]]:
+    """
+    Yield (line number, parsed record) pairs from a CSV or JSONL stream
+
+    Records that cannot be decoded or parsed are yielded as ValueError
+    instances so the caller can report them per row. CSV fields may contain quoted
+    newlines; the line number is where the record starts.
+    """
+    header = None
+    record, start, error = "", 0, None
+    line_no = 0
+    async for line, line_error in iter_lines(chunks):
+        line_no += 1
+        if fmt == "jsonl":
+            if not line.strip():
+                continue
+            if line_error:
+                yield line_no, line_error
+                continue
+            try:
+                yield line_no, json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_no, ValueError(f"Invalid JSON: {e.msg}")
+            continue
+
+        # CSV: keep joining lines while a quoted field is still open
+        if not record:
+            start = line_no
+            record = line
+        else:
+            record += "\n" + line
+        error = error or line_error
+        if record.count('"') % 2:
+            continue
+
+        text, record = record, ""
+        if error:
+            yield start, error
+            error = None
+            continue
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip().lower() for name in values]
+            continue
+        if len(values) != len(header):
+            yield start, ValueError(f"Expected {len(header)} columns, got {len(values)}")
+            continue
+        yield start, dict(zip(header, values))
+
+    if record:
+        yield start, ValueError("Unterminated quoted field")
+
+
+def _optional(value: Any) -> Any:
+    if isinstance(value, str):
+        value = value.strip()
+        return value or None
+    return value
+
+
+def validate_student(record: Any) -> Dict[str, Any]:
+    """
+    Convert a parsed record into StudentProfile column values
+
+    Only columns present in the record are returned, so an upsert leaves
+    the others untouched.
+
+    Raises:
+        ValueError: Describing the first problem found
+    """
+    if not isinstance(record, dict):
+        raise ValueError("Record must be an object")
+
+    row: Dict[str, Any] = {}
+    for field, value in record.items():
+        column = FIELD_COLUMNS.get(str(field).strip().lower())
+        if not column:
+            continue
+        if isinstance(value, list) and column in LIST_COLUMNS:
+            if any(isinstance(item, (dict, list)) for item in value):
+                raise ValueError(f"Field '{field}' must be a list of strings")
+            value = ", ".join(str(item) for item in value)
+        elif isinstance(value, (dict, list)):
+            expected = "text or a list of strings" if column in LIST_COLUMNS else "a single value"
+            raise ValueError(f"Field '{field}' must be {expected}")
+        row[column] = _optional(value)
+
+    for field in REQUIRED_FIELDS:
+        if not row.get(field):
+            raise ValueError(f"Missing required field '{field}'")
+    for column in TEXT_COLUMNS:
+        if row.get(column) is not None:
+            row[column] = str(row[column])
+
+    if row.get("current_cgpa") is not None:
+        try:
+            row["current_cgpa"] = float(row["current_cgpa"])
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid cgpa '{row['current_cgpa']}'")
+        if not 0 <= row["current_cgpa"] <= 10:
+            raise ValueError(f"cgpa {row['current_cgpa']} is outside 0-10")
+
+    for column in ("arrears_count", "year"):
+        if row.get(column) is not None:
+            try:
+                row[column] = int(row[column])
+            except (TypeError, ValueError):
+                raise ValueError(f"Invalid {column} '{row[column]}'")
+
+    if "arrears_count" in row:
+        row["arrears_count"] = row["arrears_count"] or 0
+    return row
@@ -0,0 +1,119 @@
+"""
+Normalized skill and target-company index for student profiles
+"""
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import delete, func, insert, select
+
+from backend.models.database import StudentProfile, StudentSkill, StudentTarget
+
+# StudentProfile text column -> (index model, index value column)
+TAG_INDEXES = {
+    "skills": (StudentSkill, "skill"),
+    "target_companies": (StudentTarget, "company")
+}
+
+
+def parse_tags(value: Optional[str]) -> List[str]:
+    """
+    Split a comma-separated profile field into normalized tags
+
+    Tags are trimmed and lowercased; duplicates and empty entries are dropped.
+    """
+    if not value:
+        return []
+    return sorted({tag.strip().lower() for tag in value.split(",") if tag.strip()})
+
+
+async def sync_student_tags(db, profiles: Iterable[Dict[str, Optional[str]]]) -> None:
+    """
+    Replace the indexed skills and target companies of the given students
+
+    Runs inside the caller's transaction.
+
+    Args:
+        db: Async session writing the profiles
+        profiles: Dicts with student_id and the new skills / target_companies
+            text; a field that is absent is left untouched, and a
+            student listed more than once gets its last value
+    """
+    profiles = list(profiles)
+    for field, (model, column) in TAG_INDEXES.items():
+        # A student listed more than once keeps its last value
+        changed = {profile["student_id"]: profile[field] for profile in profiles if field in profile}
+        if not changed:
+            continue
+
+        await db.execute(delete(model).where(model.student_id.in_(list(changed))))
+        rows = [
+            {"student_id": student_id, column: tag}
+            for student_id, value in changed.items()
+            for tag in parse_tags(value)
+        ]
+        if rows:
+            await db.execute(insert(model), rows)
+
+
+async def delete_student_tags(db, student_id: str) -> None:
+    """Remove a student's indexed tags inside the caller's transaction"""
+    for model, _ in TAG_INDEXES.values():
+        await db.execute(delete(model).where(model.student_id == student_id))
+
+
+async def tags_need_backfill(db) -> bool:
+    """Whether profiles list skills or targets but the index tables are empty"""
+    has_tags = await db.scalar(
+        select(StudentProfile.student_id).where(
+            (StudentProfile.skills != "") | (StudentProfile.target_companies != "")
+        ).limit(1)
+    )
+    if has_tags is None:
+        return False
+    for model, _ in TAG_INDEXES.values():
+        if await db.scalar(select(model.student_id).limit(1)) is not None:
+            return False
+    return True
+
+
+async def backfill_student_tags(db, batch_size: int = 1000) -> int:
+    """
+    Rebuild the skill and target indexes from every student profile
+
+    Args:
+        db: Async session; the caller commits
+
+    Returns:
+        Number of profiles indexed
+    """
+    total = 0
+    last_id = ""
+    while True:
+        result = await db.execute(
+            select(StudentProfile.student_id, StudentProfile.skills, StudentProfile.target_companies)
+            .where(StudentProfile.student_id > last_id)
+            .order_by(StudentProfile.student_id)
+            .limit(batch_size)
+        )
+        profiles = [dict(row) for row in result.mappings()]
+        if not profiles:
+            return total
+        await sync_student_tags(db, profiles)
+        total += len(profiles)
+        last_id = profiles[-1]["student_id"]
+
+
+def tag_filter(model, column: str, tags: List[str], match_all: bool):
+    """
+    Subquery of student_ids having all (or any) of the given tags
+
+    Args:
+        model: StudentSkill or StudentTarget
+        column: Name of the tag column on the model
+        tags: Normalized tags to look up
+        match_all: Require every tag instead of at least one
+    """
+    tag_column = getattr(model, column)
+    query = select(model.student_id).where(tag_column.in_(tags))
+    if match_all:
+        query = query.group_by(model.student_id).having(func.count() == len(tags))
+    return query
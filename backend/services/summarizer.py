@@ -0,0 +1,89 @@
+"""
+Rolling conversation summarization to keep prompt history short
+"""
+import logging
+from typing import List, Set
+
+from backend.config import config
+from backend.services.llm_client import llm_client
+from backend.services.session import session_manager
+from backend.services.session_store import CompactMessage
+from backend.prompts.system_prompts import CONVERSATION_SUMMARY_PROMPT
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token)"""
+    return len(text) // 4 + 1
+
+
+class ConversationSummarizer:
+    """Folds older turns into a cached running summary stored on the session"""
+
+    def __init__(self, token_threshold: int, keep_recent: int):
+        """
+        Initialize summarizer
+
+        Args:
+            token_threshold: Unsummarized history size that triggers folding
+            keep_recent: Number of latest messages never folded
+        """
+        self.token_threshold = token_threshold
+        self.keep_recent = keep_recent
+        self._in_progress: Set[str] = set()
+
+    async def maybe_summarize(self, session_id: str) -> bool:
+        """
+        Fold older turns into the session summary if history is over the threshold
+
+        Runs as a background task after the response is sent.
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            Whether the summary was updated
+        """
+        if session_id in self._in_progress:
+            return False
+
+        self._in_progress.add(session_id)
+        try:
+            summary, history = await session_manager.get_prompt_history(session_id)
+            if sum(estimate_tokens(msg.content) for msg in history) <= self.token_threshold:
+                return False
+
+            to_fold = history[:-self.keep_recent] if self.keep_recent else history
+            if not to_fold:
+                return False
+
+            new_summary = await self._summarize(summary, to_fold)
+            return await session_manager.update_summary(session_id, new_summary, to_fold[-1].created)
+        except Exception as e:
+            logger.error(f"Summarization failed for session {session_id}: {e}")
+            return False
+        finally:
+            self._in_progress.discard(session_id)
+
+    async def _summarize(self, previous_summary: str, messages: List[CompactMessage]) -> str:
+        """Ask the LLM to merge new turns into the previous summary"""
+        transcript = "\n".join(f"{msg.role.value.capitalize()}: {msg.content}" for msg in messages)
+        prompt = CONVERSATION_SUMMARY_PROMPT.format(
+            previous_summary=previous_summary or "(none)",
+            transcript=transcript
+        )
+
+        return await llm_client.generate_response(
+            messages=[{"role": "user", "content": prompt}],
+            system_prompt="You maintain concise running summaries of student mentoring conversations.",
+            temperature=0.2,
+            max_tokens=config.SUMMARY_MAX_TOKENS
+        )
+
+
+# Singleton instance
+conversation_summarizer = ConversationSummarizer(
+    token_threshold=config.SUMMARY_TOKEN_THRESHOLD,
+    keep_recent=config.SUMMARY_KEEP_RECENT
+)
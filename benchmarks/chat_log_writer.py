@@ -0,0 +1,60 @@
+"""
+Write throughput benchmark: per-row log_chat vs the batched ChatLogWriter
+
+Usage:
+    python benchmarks/chat_log_writer.py [rows]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.services.database_service import DatabaseService
+
+
+def _row(i: int) -> dict:
+    return {
+        "session_id": f"session-{i % 100}",
+        "user_message": f"How do I prepare for interview round {i}?",
+        "bot_response": "Practice data structures, system design and behavioral questions.",
+        "student_id": None,
+        "sentiment": "technical",
+        "persona": "strict_recruiter",
+        "domain": "software_development",
+        "intent": "interview_prep"
+    }
+
+
+async def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    direct_rows = min(rows, 1000)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseService(f"sqlite:///{tmp}/bench.db")
+        await db.start()
+
+        start = time.perf_counter()
+        for i in range(direct_rows):
+            await db.log_chat(**_row(i))
+        direct = direct_rows / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for i in range(rows):
+            await db.queue_chat_log(**_row(i))
+        await db.log_writer.flush()
+        batched = rows / (time.perf_counter() - start)
+
+        stats = db.log_writer.stats()
+        await db.close()
+
+    print(f"log_chat (one commit per row): {direct:>10,.0f} rows/s ({direct_rows} rows)")
+    print(f"ChatLogWriter (batched):       {batched:>10,.0f} rows/s ({rows} rows)")
+    print(f"Batches: {stats['batches']}, avg batch size: {stats['avg_batch_size']}, "
+          f"backpressure waits: {stats['backpressure_waits']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
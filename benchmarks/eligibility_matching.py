@@ -0,0 +1,74 @@
+"""
+Eligibility matching benchmark: synthetic cohort ranked against many companies
+
+Usage:
+    python benchmarks/eligibility_matching.py [students] [companies]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.models.schemas import CompanyCriteria
+from backend.services.eligibility import CohortMatrix
+
+SKILLS = [
+    "verilog", "systemverilog", "uvm", "python", "c", "c++", "java", "sql", "matlab",
+    "embedded c", "rtos", "pcb design", "machine learning", "react", "docker", "aws"
+] + [f"skill-{i}" for i in range(184)]
+DEPARTMENTS = ["ECE", "CSE", "EEE", "Mechanical", "IT"]
+
+
+def main():
+    students = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    companies = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    random.seed(7)
+
+    profiles = [
+        {
+            "student_id": f"S{i:06d}",
+            "name": f"Student {i}",
+            "department": random.choice(DEPARTMENTS),
+            "current_cgpa": round(random.uniform(5, 10), 2),
+            "arrears_count": random.choice([0, 0, 0, 1, 2]),
+            "year": random.choice([3, 4])
+        }
+        for i in range(students)
+    ]
+    skills = [
+        (profile["student_id"], skill)
+        for profile in profiles
+        for skill in random.sample(SKILLS, random.randint(3, 10))
+    ]
+    criteria = [
+        CompanyCriteria(
+            company=f"Company {j}",
+            min_cgpa=random.choice([6.5, 7.0, 7.5, 8.0]),
+            max_arrears=random.choice([0, 1]),
+            departments=random.sample(DEPARTMENTS, 2),
+            required_skills=random.sample(SKILLS[:16], random.randint(0, 2)),
+            preferred_skills=random.sample(SKILLS[:16], 4),
+            limit=50
+        )
+        for j in range(companies)
+    ]
+
+    start = time.perf_counter()
+    cohort = CohortMatrix(profiles, skills)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = [cohort.match(company) for company in criteria]
+    match = time.perf_counter() - start
+
+    eligible = sum(result["eligible"] for result in results) / len(results)
+    print(f"Cohort: {students} students, {len(cohort.skills)} distinct skills, {len(skills)} skill rows")
+    print(f"Build columnar cohort: {build * 1000:8.1f} ms (once, reused until a profile write)")
+    print(f"Match {companies} companies: {match * 1000:8.1f} ms "
+          f"({match * 1000 / companies:.2f} ms per company, {eligible:.0f} eligible on average)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Keyword routing cost per message: substring scan vs the Aho–Corasick matcher
+
+Also lists the sample queries where the substring scan matched keywords
+inside other words.
+
+Usage:
+    python benchmarks/intent_keywords.py [iterations]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")  # llm_client is imported but never called
+
+from backend.services.intent_router import IntentRouter
+
+QUERIES = [
+    "How do I prepare for a mock interview at Qualcomm for a verification role?",
+    "I'm confused about which domain to choose, I said I like electronics but feel lost",
+    "Can you explain how UART and SPI differ on an ARM microcontroller?",
+    "What is the time complexity of building a heap from an unsorted array?",
+    "My email to the recruiter about the training program got no reply, what should I do?",
+    "Suggest a roadmap to learn machine learning and deep learning models in six months",
+    "The fire alarm project in my hardware lab used an Arduino and a smoke sensor",
+    "Which companies hire for physical design and static timing analysis roles?",
+    "I feel stressed because the placement drive is in two weeks and I can't decide",
+    "Review my resume for a backend developer internship using Python and Docker",
+]
+
+
+def substring_scan(router: IntentRouter, query: str):
+    """The previous matching: every keyword tested with `in` against the lowercased query"""
+    query_lower = query.lower()
+    groups = {
+        **router.domain_keywords,
+        "strict_recruiter": router.strict_recruiter_keywords,
+        "supportive_mentor": router.supportive_mentor_keywords
+    }
+    return {
+        group: [keyword for keyword in keywords if keyword in query_lower]
+        for group, keywords in groups.items()
+    }
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    router = IntentRouter()
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for query in QUERIES:
+            substring_scan(router, query)
+    substring = (time.perf_counter() - start) / (iterations * len(QUERIES))
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for query in QUERIES:
+            router.keyword_matcher.find(query)
+    automaton = (time.perf_counter() - start) / (iterations * len(QUERIES))
+
+    print(f"substring scan: {substring * 1e6:6.1f} µs per message")
+    print(f"Aho–Corasick:   {automaton * 1e6:6.1f} µs per message\n")
+
+    for query in QUERIES:
+        whole_words = {keyword for found in router.keyword_matcher.find(query).values() for keyword in found}
+        inside_words = sorted(
+            keyword for found in substring_scan(router, query).values() for keyword in found
+            if keyword not in whole_words
+        )
+        if inside_words:
+            print(f"{query}\n    substring-only matches: {', '.join(inside_words)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Chat-log write latency while dashboard queries scan the database,
+with and without the read-only connection pool
+
+Each dashboard query ranks every seeded chat with full-text search, so it
+spends its time inside SQLite rather than in Python. With a shared pool,
+enough concurrent dashboards hold every connection and writers queue
+behind them; with the read pool, writes keep their own connection.
+
+Usage:
+    python benchmarks/read_pool.py [seconds] [writers] [dashboards] [directory]
+"""
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.config import config
+from backend.services.database_service import DatabaseService
+
+SEED_ROWS = 50000
+
+
+async def _seed(db: DatabaseService) -> None:
+    for i in range(SEED_ROWS):
+        await db.queue_chat_log(
+            session_id=f"session-{i % 500}",
+            user_message=f"Which companies visit for VLSI roles? ({i})",
+            bot_response="Intel, Qualcomm, Texas Instruments and NXP usually recruit for VLSI.",
+            student_id=f"S{i % 200:04d}",
+            domain="vlsi"
+        )
+    await db.log_writer.flush()
+
+
+def _p95_ms(latencies: list) -> float:
+    if len(latencies) < 2:
+        return latencies[0] * 1000 if latencies else 0.0
+    return statistics.quantiles(latencies, n=20)[-1] * 1000
+
+
+async def run(read_pool: bool, seconds: float, writers: int, readers: int, directory: str = None) -> None:
+    config.DB_READ_POOL = read_pool
+    with tempfile.TemporaryDirectory(dir=directory) as tmp:
+        db = DatabaseService(f"sqlite:///{tmp}/bench.db")
+        await db.start()
+        await _seed(db)
+
+        write_latencies, dashboards = [], []
+        deadline = time.perf_counter() + seconds
+
+        async def writer():
+            i = 0
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                await db.log_chat(f"live-{i % 50}", "Any tips for the aptitude round?",
+                                  "Practice time-boxed quant and logical reasoning sets.",
+                                  student_id=f"S{i % 200:04d}", domain="general")
+                write_latencies.append(time.perf_counter() - start)
+                i += 1
+
+        async def dashboard():
+            while time.perf_counter() < deadline:
+                await db.search_chat_logs("vlsi", limit=10)
+                dashboards.append(1)
+
+        await asyncio.gather(*(writer() for _ in range(writers)), *(dashboard() for _ in range(readers)))
+        pools = db.pool_stats()
+        await db.close()
+
+    label = "read pool" if pools["read_pool"] else "shared pool"
+    print(f"{label:11}  writes {len(write_latencies) / seconds:6.0f}/s  "
+          f"p95 {_p95_ms(write_latencies):7.2f} ms  max {max(write_latencies) * 1000:7.2f} ms  "
+          f"dashboards {len(dashboards) / seconds:5.1f}/s")
+    for name in ("writer", "reader"):
+        if name in pools:
+            print(f"  {name:6}  statement p95 {pools[name]['statement_latency']['p95_ms']} ms, "
+                  f"connection hold p95 {pools[name]['connection_hold']['p95_ms']} ms")
+
+
+async def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    writers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    readers = int(sys.argv[3]) if len(sys.argv) > 3 else 40
+    directory = sys.argv[4] if len(sys.argv) > 4 else None
+
+    print(f"{writers} writers, {readers} dashboards over {SEED_ROWS} chats, {seconds:g}s per run\n")
+    for read_pool in (False, True):
+        await run(read_pool, seconds, writers, readers, directory)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,118 @@
+"""
+Database size and scan speed with inline vs deduplicated, compressed bot responses
+
+Seeds chat logs the way older versions stored them (text inline in
+chat_logs), measures, then moves the text into response_blobs with
+pack_inline_responses() and measures again.
+
+Usage:
+    python benchmarks/response_blobs.py [rows] [repeated share]
+"""
+import asyncio
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.models.database import register_sqlite_functions
+from backend.services.database_service import DatabaseService
+
+FALLBACKS = [
+    "I'm having trouble connecting right now. Please try again in a moment.",
+    "Sorry, something went wrong while generating a response. Please rephrase your question.",
+    "I can only help with placement preparation, careers and interviews."
+]
+WORDS = (
+    "verilog systemverilog uvm timing closure static analysis embedded rtos interview aptitude "
+    "resume project internship placement company round technical hr coding practice design "
+    "digital analog circuit layout synthesis verification firmware microcontroller linux python"
+).split()
+
+
+def _seed(path: str, rows: int, repeated: float) -> None:
+    random.seed(11)
+    roadmaps = [
+        " ".join(random.choice(WORDS) for _ in range(random.randint(150, 450))) for _ in range(20)
+    ]
+    conn = sqlite3.connect(path)
+    register_sqlite_functions(conn)
+    batch = []
+    for i in range(rows):
+        roll = random.random()
+        if roll < repeated / 2:
+            response = random.choice(FALLBACKS)
+        elif roll < repeated:
+            response = random.choice(roadmaps)
+        else:
+            response = " ".join(random.choice(WORDS) for _ in range(random.randint(60, 400)))
+        batch.append((
+            f"S{i % 300:04d}", f"session-{i % 2000}", f"Question {i} about {random.choice(WORDS)}",
+            response, f"2026-0{1 + i % 9}-1{i % 10} 10:00:00", random.choice(["anxious", "neutral", "technical"]),
+            "supportive_mentor", "vlsi", "general_query"
+        ))
+        if len(batch) >= 5000:
+            _insert(conn, batch)
+            batch = []
+    _insert(conn, batch)
+    conn.close()
+
+
+def _insert(conn, batch) -> None:
+    conn.executemany(
+        "INSERT INTO chat_logs (student_id, session_id, user_message, bot_response, timestamp, "
+        "sentiment_detected, persona_used, domain, intent) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        batch
+    )
+    conn.commit()
+
+
+async def _measure(db: DatabaseService, path: str, label: str) -> None:
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    start = time.perf_counter()
+    for _ in range(5):
+        conn.execute("SELECT sentiment_detected, COUNT(*) FROM chat_logs GROUP BY sentiment_detected").fetchall()
+    scan = (time.perf_counter() - start) / 5
+    conn.close()
+
+    start = time.perf_counter()
+    for i in range(200):
+        await db.get_chat_history(session_id=f"session-{i}", limit=20)
+    history = (time.perf_counter() - start) / 200
+
+    start = time.perf_counter()
+    exported = 0
+    async for row in db.stream_chat_logs():
+        exported += len(row["bot_response"])
+    export = time.perf_counter() - start
+
+    print(f"{label:8}  file {os.path.getsize(path) / 1024 / 1024:7.1f} MB  "
+          f"metadata scan {scan * 1000:7.1f} ms  history page {history * 1000:5.2f} ms  "
+          f"export {export:5.2f} s ({exported / 1024 / 1024:.0f} MB of text)")
+
+
+async def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    repeated = float(sys.argv[2]) if len(sys.argv) > 2 else 0.4
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = f"{tmp}/bench.db"
+        db = DatabaseService(f"sqlite:///{path}")
+        _seed(path, rows, repeated)
+        print(f"{rows} chats, {repeated:.0%} repeating a fallback or stock roadmap\n")
+        await _measure(db, path, "inline")
+
+        start = time.perf_counter()
+        await db.pack_inline_responses()
+        pages = await asyncio.to_thread(db._incremental_vacuum, True)
+        print(f"migrated in {time.perf_counter() - start:.1f} s, file shrank by {pages} pages")
+        await _measure(db, path, "blobs")
+        await db.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,81 @@
+"""
+Memory benchmark for session history storage
+
+Compares bytes per session for pydantic ChatMessage lists (previous
+representation) against CompactMessage ring buffers.
+
+Usage:
+    python benchmarks/session_memory.py [sessions] [messages_per_session]
+"""
+import os
+import sys
+import tracemalloc
+from collections import deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.models.schemas import ChatMessage, MessageRole
+from backend.services.session_store import CompactMessage
+
+
+def _turns(count: int):
+    """Yield alternating user/assistant turns with realistic metadata"""
+    for i in range(count):
+        if i % 2 == 0:
+            yield MessageRole.USER, f"How should I prepare for round {i} of the interview?", None
+        else:
+            yield MessageRole.ASSISTANT, f"Focus on data structures and system design for round {i}.", {
+                "domain": "software_development",
+                "confidence": 0.9,
+                "intent": "interview_prep"
+            }
+
+
+def build_pydantic(sessions: int, messages: int):
+    return {
+        f"session-{s}": [
+            ChatMessage(role=role, content=content, metadata=metadata)
+            for role, content, metadata in _turns(messages)
+        ]
+        for s in range(sessions)
+    }
+
+
+def build_compact(sessions: int, messages: int):
+    return {
+        f"session-{s}": deque(
+            (CompactMessage.create(role, content, metadata) for role, content, metadata in _turns(messages)),
+            maxlen=messages
+        )
+        for s in range(sessions)
+    }
+
+
+def measure(builder, sessions: int, messages: int) -> float:
+    """Return retained bytes per session"""
+    tracemalloc.start()
+    baseline = tracemalloc.take_snapshot()
+    data = builder(sessions, messages)
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    retained = sum(stat.size_diff for stat in snapshot.compare_to(baseline, "filename"))
+    del data
+    return retained / sessions
+
+
+def main():
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    messages = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    before = measure(build_pydantic, sessions, messages)
+    after = measure(build_compact, sessions, messages)
+
+    print(f"Sessions: {sessions}, messages per session: {messages}")
+    print(f"ChatMessage list:      {before:>10,.0f} bytes/session")
+    print(f"CompactMessage buffer: {after:>10,.0f} bytes/session")
+    print(f"Reduction:             {(1 - after / before) * 100:>9.1f}%")
+
+
+if __name__ == "__main__":
+    main()
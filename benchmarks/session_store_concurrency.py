@@ -0,0 +1,109 @@
+"""
+Session store throughput and event loop lag as concurrent requests scale
+
+Every request coroutine runs on one event loop, which is what lets
+InMemorySessionStore use plain dicts without locks: the benchmark runs
+cleanup passes concurrently with the request load and checks the maps
+stay consistent. With a resident limit below the working set, each
+request evicts a session, and some requests delete and recreate a
+session or look up an unknown id. "inline" commits every spill write and
+delete on the loop as earlier versions did; "batched" is the current
+worker-thread flush.
+
+Usage:
+    python benchmarks/session_store_concurrency.py [seconds] [sessions] [max_resident]
+"""
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.models.schemas import MessageRole, SessionContext
+from backend.services.session_store import CompactMessage, InMemorySessionStore, SQLiteSessionSpill
+
+CONCURRENCY = (1, 8, 64, 256)
+
+
+class InlineSpillStore(InMemorySessionStore):
+    """Previous behaviour: each spill write or delete is committed on the event loop"""
+
+    def _schedule_spill(self) -> None:
+        self._spill.apply(list(self._unspilled.values()), list(self._spill_deletes))
+        self._unspilled.clear()
+        self._spill_deletes.clear()
+
+
+def _check_invariants(store: InMemorySessionStore, max_resident: int) -> None:
+    assert set(store._sessions) == set(store._histories), "session and history maps diverged"
+    assert len(store._sessions) <= max_resident, "resident limit exceeded"
+    assert not set(store._sessions) & set(store._unspilled), "session both resident and queued for spill"
+
+
+async def run(store_class, concurrency: int, seconds: float, sessions: int, max_resident: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        store = store_class(3600, 20, max_resident, SQLiteSessionSpill(f"{tmp}/spill.db"))
+        for i in range(sessions):
+            await store.create(SessionContext(session_id=f"session-{i}"))
+
+        ops, lags = 0, []
+        deadline = time.perf_counter() + seconds
+
+        async def client(seed: int):
+            nonlocal ops
+            rng = random.Random(seed)
+            while time.perf_counter() < deadline:
+                session_id = f"session-{rng.randrange(sessions)}"
+                message = CompactMessage.create(MessageRole.USER, "How do I prepare for the aptitude round?")
+                await store.append_message(session_id, message)
+                await store.get_history(session_id, limit=10)
+                ops += 2
+                if rng.random() < 0.05:
+                    # Ended sessions, restarted conversations and stale client ids
+                    await store.delete(session_id)
+                    await store.create(SessionContext(session_id=session_id))
+                    await store.load(f"unknown-{rng.randrange(1 << 30)}")
+                    ops += 3
+                await asyncio.sleep(0)
+
+        async def cleaner():
+            while time.perf_counter() < deadline:
+                await store.cleanup_expired()
+                _check_invariants(store, max_resident)
+                await asyncio.sleep(0.05)
+
+        async def ticker():
+            # How late a 1 ms timer fires: time the loop spent blocked
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                await asyncio.sleep(0.001)
+                lags.append(time.perf_counter() - start - 0.001)
+
+        await asyncio.gather(*(client(seed) for seed in range(concurrency)), cleaner(), ticker())
+        _check_invariants(store, max_resident)
+        stats = store.stats()
+        await store.close()
+
+    label = "inline" if store_class is InlineSpillStore else "batched"
+    print(f"{label:8} {concurrency:4} clients  {ops / seconds:8.0f} ops/s  "
+          f"loop lag p99 {statistics.quantiles(lags, n=100)[-1] * 1000:6.2f} ms  "
+          f"max {max(lags) * 1000:6.2f} ms  evictions {stats['evictions']}")
+
+
+async def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 3
+    sessions = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    max_resident = int(sys.argv[3]) if len(sys.argv) > 3 else 1000
+
+    print(f"{sessions} sessions, {max_resident} resident, {seconds:g}s per run\n")
+    for store_class in (InlineSpillStore, InMemorySessionStore):
+        for concurrency in CONCURRENCY:
+            await run(store_class, concurrency, seconds, sessions, max_resident)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
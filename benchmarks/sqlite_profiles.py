@@ -0,0 +1,101 @@
+"""
+Mixed read/write throughput of each SQLite storage profile
+
+Runs concurrent writers (one log_chat commit per operation) and readers
+(chat history pages) against a fresh seeded database per profile.
+
+Usage:
+    python benchmarks/sqlite_profiles.py [seconds] [writers] [readers] [directory]
+
+Pass a directory on the disk the real database lives on; a tmpfs /tmp
+makes fsync free and hides the difference between synchronous levels.
+"""
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.models.database import SQLITE_PROFILES
+from backend.services.database_service import DatabaseService
+
+SEED_ROWS = 20000
+STUDENTS = 200
+
+
+async def _seed(db: DatabaseService) -> None:
+    for i in range(STUDENTS):
+        await db.create_student(f"S{i:04d}", f"Student {i}", "ECE")
+    for i in range(SEED_ROWS):
+        await db.queue_chat_log(
+            session_id=f"session-{i % 500}",
+            user_message=f"How do I prepare for interview round {i}?",
+            bot_response="Practice data structures, system design and behavioral questions.",
+            student_id=f"S{i % STUDENTS:04d}",
+            domain="software_development"
+        )
+    await db.log_writer.flush()
+
+
+async def _worker(op, deadline: float, latencies: list) -> None:
+    i = 0
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        await op(i)
+        latencies.append(time.perf_counter() - start)
+        i += 1
+
+
+def _summary(latencies: list, seconds: float) -> str:
+    if not latencies:
+        return "no operations"
+    p95 = statistics.quantiles(latencies, n=20)[-1] * 1000 if len(latencies) > 1 else latencies[0] * 1000
+    return f"{len(latencies) / seconds:8.0f} ops/s  p95 {p95:6.2f} ms"
+
+
+async def run_profile(profile: str, seconds: float, writers: int, readers: int,
+                      directory: str = None) -> None:
+    with tempfile.TemporaryDirectory(dir=directory) as tmp:
+        db = DatabaseService(f"sqlite:///{tmp}/bench.db", storage_profile=profile)
+        await db.start()
+        await _seed(db)
+
+        async def write(i: int):
+            await db.log_chat(
+                session_id=f"session-{i % 500}",
+                user_message="What should I revise before the Intel drive?",
+                bot_response="Focus on digital design fundamentals and Verilog.",
+                student_id=f"S{i % STUDENTS:04d}",
+                domain="vlsi"
+            )
+
+        async def read(i: int):
+            await db.get_chat_history(student_id=f"S{(i * 7) % STUDENTS:04d}", limit=20)
+
+        write_latencies, read_latencies = [], []
+        deadline = time.perf_counter() + seconds
+        await asyncio.gather(
+            *(_worker(write, deadline, write_latencies) for _ in range(writers)),
+            *(_worker(read, deadline, read_latencies) for _ in range(readers))
+        )
+        await db.close()
+
+    print(f"{profile:9}  writes {_summary(write_latencies, seconds)}   reads {_summary(read_latencies, seconds)}")
+
+
+async def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    writers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    readers = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+    directory = sys.argv[4] if len(sys.argv) > 4 else None
+
+    print(f"{writers} writers, {readers} readers, {seconds:g}s per profile, {SEED_ROWS} seeded chats\n")
+    for profile in SQLITE_PROFILES:
+        await run_profile(profile, seconds, writers, readers, directory)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
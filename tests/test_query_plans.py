@@ -0,0 +1,154 @@
+"""
+Query-plan regression test for DatabaseService reads
+
+Runs every DatabaseService read path (and the archive pass's batch
+query) against a seeded database, captures the SQL it issues and runs
+EXPLAIN QUERY PLAN on each statement. Fails if a chat_logs or
+student_profiles query does a full table scan or sorts through a temp
+B-tree, or if a filtered rollup query cannot seek an index.
+
+Usage:
+    python -m pytest tests/test_query_plans.py
+"""
+import asyncio
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+
+from backend.services.chat_archive import ChatLogArchive
+from backend.services.database_service import DatabaseService, encode_cursor
+
+# Hot tables must never be read end to end or sorted outside an index
+HOT_TABLES = ("chat_logs", "student_profiles", "student_skills", "student_targets")
+FULL_SCAN = re.compile(r"\bSCAN (\w+)\b(?! USING)")
+TEMP_SORT = re.compile(r"USE TEMP B-TREE FOR (ORDER BY|RIGHT PART OF ORDER BY)")
+
+
+async def _seed(db: DatabaseService) -> None:
+    for i in range(50):
+        await db.create_student(
+            f"S{i:03d}", f"Student {i}", "ECE", cgpa=7 + i % 3,
+            skills=", ".join(f"skill{(i + k) % 40}" for k in range(3)),
+            target_companies=f"company{i % 20}, company{(i + 7) % 20}"
+        )
+    start = datetime.utcnow() - timedelta(days=30)
+    for i in range(2000):
+        await db.queue_chat_log(
+            session_id=f"session-{i % 40}",
+            user_message=f"question {i}",
+            bot_response="answer",
+            student_id=f"S{i % 50:03d}",
+            sentiment="neutral",
+            persona="supportive_mentor",
+            domain="vlsi" if i % 2 else "software_development",
+            intent="career_guidance"
+        )
+    await db.log_writer.flush()
+
+    # Spread the rows over a month and give the planner real statistics
+    conn = sqlite3.connect(db.engine.url.database)
+    conn.execute("UPDATE chat_logs SET timestamp = datetime(?, '+' || id || ' minutes')", (start.isoformat(),))
+    conn.execute("ANALYZE")
+    conn.commit()
+    conn.close()
+
+
+def _read_paths(db: DatabaseService):
+    since = datetime.utcnow() - timedelta(days=7)
+    until = datetime.utcnow()
+    return [
+        ("list_students", lambda: db.list_students(limit=20)),
+        ("list_students cursor", lambda: db.list_students(limit=20, cursor=encode_cursor(since, "S010"))),
+        ("get_student", lambda: db.get_student("S001")),
+        ("find_students all skills", lambda: db.find_students(skills=["skill1", "skill2"], min_cgpa=8)),
+        ("find_students any skill", lambda: db.find_students(skills=["skill1", "skill9"], match_all_skills=False,
+                                                             companies=["company3"])),
+        ("chat_history", lambda: db.get_chat_history(limit=20)),
+        ("chat_history student", lambda: db.get_chat_history(student_id="S001", limit=20)),
+        ("chat_history session", lambda: db.get_chat_history(session_id="session-3", limit=20)),
+        ("export student", lambda: _drain(db.stream_chat_logs(student_id="S001"))),
+        ("export student pages", lambda: _drain(db.stream_chat_logs(student_id="S001", batch_size=16))),
+        ("export session", lambda: _drain(db.stream_chat_logs(session_id="session-3"))),
+        ("export domain range", lambda: _drain(db.stream_chat_logs(domain="vlsi", since=since, until=until))),
+        ("export time range", lambda: _drain(db.stream_chat_logs(since=since, until=until))),
+        ("search student", lambda: db.search_chat_logs("question", student_id="S001")),
+        ("sentiment student", lambda: db.get_sentiment_stats(student_id="S001")),
+        ("domain range", lambda: db.get_domain_usage(since=since, until=until)),
+        ("activity student", lambda: db.get_activity_timeline("day", student_id="S001", since=since)),
+        # Last: moves the oldest chats out of the database
+        ("archive batch", lambda: db.archive_chat_logs(older_than_days=29, batch_size=200)),
+    ]
+
+
+async def _drain(rows) -> None:
+    async for _ in rows:
+        pass
+
+
+def _violations(plan: list, statement: str) -> list:
+    found = []
+    filtered = " WHERE " in statement
+    for line in plan:
+        scan = FULL_SCAN.search(line)
+        if scan and scan.group(1) in HOT_TABLES:
+            found.append(f"full scan: {line}")
+        if scan and scan.group(1) == "chat_log_rollups" and filtered:
+            found.append(f"filtered rollup scan: {line}")
+        # Relevance ordering of full-text matches only sorts the matched rows
+        ranked = "ORDER BY rank" in statement
+        if TEMP_SORT.search(line) and not ranked and any(table in statement for table in HOT_TABLES):
+            found.append(f"temp sort: {line}")
+    return found
+
+
+async def _check_plans() -> list:
+    """Run every read path and return (label, statement, plan, problems) for each regression"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = f"{tmp}/plans.db"
+        db = DatabaseService(f"sqlite:///{path}")
+        db.archive = ChatLogArchive(f"{tmp}/archive")
+        await db.start()
+        await _seed(db)
+
+        captured = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith("SELECT"):
+                captured.append((statement, parameters))
+
+        for engine in {db.async_engine, db.read_engine}:
+            event.listen(engine.sync_engine, "before_cursor_execute", capture)
+
+        explain = sqlite3.connect(path)
+        regressions = []
+        try:
+            for label, call in _read_paths(db):
+                captured.clear()
+                db.profile_cache.invalidate()
+                await call()
+                assert captured, f"{label} issued no SELECT"
+                for statement, parameters in captured:
+                    plan = [row[3] for row in explain.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+                    problems = _violations(plan, statement)
+                    if problems:
+                        regressions.append((label, statement, plan, problems))
+        finally:
+            explain.close()
+            await db.close()
+    return regressions
+
+
+def test_read_paths_use_indexes():
+    regressions = asyncio.run(_check_plans())
+    report = "\n\n".join(
+        f"{label}: {'; '.join(problems)}\n{statement}\nplan: {' | '.join(plan)}"
+        for label, statement, plan, problems in regressions
+    )
+    assert not regressions, f"{len(regressions)} query plan regression(s)\n\n{report}"